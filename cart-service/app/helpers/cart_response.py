@@ -0,0 +1,40 @@
+import json
+from typing import Dict, List
+from app.helpers.cart_scripts import FIELD_SEPARATOR
+from app.schemas import ProductSource
+
+# Lines are validated by the request models when they are written, so reading a cart only has to
+# skip fields that do not parse; the JSON is assembled straight from the stored values instead of
+# going through a CartItemDetails per line and a second validation pass for response_model.
+_SOURCE_JSON = {source.value: json.dumps(source.value, ensure_ascii=False) for source in ProductSource}
+
+
+def render_cart(cart_data_raw: Dict[str, str]) -> bytes:
+    """
+    Builds the CartResponse JSON body from a cart's field -> quantity mapping, byte for byte what
+    FastAPI would have produced from the model. Malformed lines are skipped.
+    """
+    products: Dict[str, List[str]] = {}
+    for field, quantity in cart_data_raw.items():
+        parts = field.rsplit(FIELD_SEPARATOR, 2)
+        if len(parts) != 3:
+            continue
+        product_id, variant_index, source = parts
+        source_json = _SOURCE_JSON.get(source)
+        if source_json is None:
+            continue
+        try:
+            quantity = int(quantity)
+            variant_index = int(variant_index) if variant_index else "null"
+        except ValueError:
+            continue
+        lines = products.get(product_id)
+        if lines is None:
+            lines = products[product_id] = []
+        lines.append(f'{{"quantity":{quantity},"source":{source_json},"variantIndex":{variant_index}}}')
+
+    body = ",".join(
+        f'{json.dumps(product_id, ensure_ascii=False)}:[{",".join(lines)}]'
+        for product_id, lines in products.items()
+    )
+    return f'{{"items":{{{body}}}}}'.encode("utf-8")
@@ -0,0 +1,190 @@
+import os
+from typing import Dict, Optional, Tuple
+import redis.asyncio as redis
+from dotenv import load_dotenv
+from app.helpers.redis_client import get_redis
+
+load_dotenv()
+# Sliding expiry: every read or write of a cart pushes its expiry out again, 0 keeps carts forever
+CART_TTL_SECONDS = int(os.getenv("CART_TTL_SECONDS", str(30 * 24 * 3600)))
+# Adding a new line fails once a cart holds this many, 0 disables the limit
+CART_MAX_LINES = int(os.getenv("CART_MAX_LINES", "500"))
+
+# Cart layout: one hash per buyer with one field per line, "{product_id}|{variantIndex}|{source}"
+# (variantIndex empty for null), holding the quantity as a plain integer. Quantity changes are
+# HINCRBY/HSET on a single field, with no JSON to decode and no list to search.
+#
+# Carts written before this layout live under the legacy key as one field per product holding a
+# JSON list of {"quantity", "source", "variantIndex"} entries. Every script first converts a legacy
+# cart it finds into the new layout and deletes it, so carts migrate on first touch.
+#
+# All scripts take KEYS[1] cart key, KEYS[2] legacy cart key, ARGV[1] TTL in seconds.
+FIELD_SEPARATOR = "|"
+
+_MIGRATE = r"""
+local function migrate(key, legacy_key)
+    if redis.call("EXISTS", legacy_key) == 0 then return end
+    local legacy = redis.call("HGETALL", legacy_key)
+    for i = 1, #legacy, 2 do
+        local ok, variants = pcall(cjson.decode, legacy[i + 1])
+        if ok and type(variants) == "table" then
+            for _, item in ipairs(variants) do
+                -- Entries that get_cart could not have returned are dropped, like it skipped them
+                if type(item) == "table" and type(item["quantity"]) == "number" and type(item["source"]) == "string"
+                        and item["quantity"] == math.floor(item["quantity"]) then
+                    local variant_index = item["variantIndex"]
+                    local index_part = nil
+                    if variant_index == nil or variant_index == cjson.null then
+                        index_part = ""
+                    elseif type(variant_index) == "number" and variant_index == math.floor(variant_index) then
+                        index_part = string.format("%d", variant_index)
+                    end
+                    if index_part then
+                        local field = legacy[i] .. "|" .. index_part .. "|" .. item["source"]
+                        redis.call("HINCRBY", key, field, item["quantity"])
+                    end
+                end
+            end
+        end
+    end
+    redis.call("DEL", legacy_key)
+end
+
+local function touch(key, ttl)
+    if tonumber(ttl) > 0 then redis.call("EXPIRE", key, ttl) end
+end
+
+-- Whether any line of the product is in the cart; only used to tell the two not-found errors apart
+local function has_product(key, product_id)
+    local pattern = string.gsub(product_id, "([%[%]%*%?\\])", "\\%1") .. "|*"
+    local cursor = "0"
+    repeat
+        local page = redis.call("HSCAN", key, cursor, "MATCH", pattern, "COUNT", 100)
+        cursor = page[1]
+        -- MATCH also finds products whose id merely starts with "{product_id}|", so compare the id
+        -- split off the last two separators, as parse_field does
+        for i = 1, #page[2], 2 do
+            if string.match(page[2][i], "^(.*)|[^|]*|[^|]*$") == product_id then return true end
+        end
+    until cursor == "0"
+    return false
+end
+"""
+
+READ_CART = _MIGRATE + """
+migrate(KEYS[1], KEYS[2])
+touch(KEYS[1], ARGV[1])
+return redis.call("HGETALL", KEYS[1])
+"""
+
+# ARGV[2] max lines, ARGV[3] field, ARGV[4] quantity to add. Returns {"added", new quantity} or {"full"}.
+ADD_ITEM = _MIGRATE + """
+migrate(KEYS[1], KEYS[2])
+local max_lines = tonumber(ARGV[2])
+if max_lines > 0 and redis.call("HEXISTS", KEYS[1], ARGV[3]) == 0 and redis.call("HLEN", KEYS[1]) >= max_lines then
+    touch(KEYS[1], ARGV[1])
+    return {"full"}
+end
+local quantity = redis.call("HINCRBY", KEYS[1], ARGV[3], ARGV[4])
+touch(KEYS[1], ARGV[1])
+return {"added", quantity}
+"""
+
+# ARGV[2] field, ARGV[3] product_id, ARGV[4] new quantity, 0 removes the line. Returns {status, quantity}.
+UPDATE_ITEM = _MIGRATE + """
+migrate(KEYS[1], KEYS[2])
+touch(KEYS[1], ARGV[1])
+local current = redis.call("HGET", KEYS[1], ARGV[2])
+if not current then
+    if has_product(KEYS[1], ARGV[3]) then return {"missing_variant"} end
+    return {"missing_product"}
+end
+local quantity = tonumber(ARGV[4])
+if quantity < 0 then return {"negative"} end
+if quantity == 0 then
+    redis.call("HDEL", KEYS[1], ARGV[2])
+    return {"removed", current}
+end
+redis.call("HSET", KEYS[1], ARGV[2], ARGV[4])
+return {"updated", ARGV[4]}
+"""
+
+# ARGV[2] field, ARGV[3] product_id. Returns {status, quantity}.
+REMOVE_ITEM = _MIGRATE + """
+migrate(KEYS[1], KEYS[2])
+touch(KEYS[1], ARGV[1])
+local current = redis.call("HGET", KEYS[1], ARGV[2])
+if not current then
+    if has_product(KEYS[1], ARGV[3]) then return {"missing_variant"} end
+    return {"missing_product"}
+end
+redis.call("HDEL", KEYS[1], ARGV[2])
+return {"removed", current}
+"""
+
+_registered: Tuple[redis.Redis, dict] | None = None
+
+
+def get_scripts() -> dict:
+    """
+    Scripts registered on the current client. Calling one runs EVALSHA and only falls back to
+    SCRIPT LOAD when Redis does not know the script yet, e.g. after a restart.
+    """
+    global _registered
+    client = get_redis()
+    if _registered is None or _registered[0] is not client:
+        _registered = (client, {
+            "read": client.register_script(READ_CART),
+            "add": client.register_script(ADD_ITEM),
+            "update": client.register_script(UPDATE_ITEM),
+            "remove": client.register_script(REMOVE_ITEM),
+        })
+    return _registered[1]
+
+
+def cart_field(product_id: str, variant_index: Optional[int], source: str) -> str:
+    return f"{product_id}{FIELD_SEPARATOR}{'' if variant_index is None else variant_index}{FIELD_SEPARATOR}{source}"
+
+
+def parse_field(field: str) -> Tuple[str, Optional[int], str]:
+    """Splits a cart field into (product_id, variantIndex, source). Raises ValueError for malformed fields."""
+    # Split from the right: sources never contain the separator, product ids might
+    product_id, variant_index, source = field.rsplit(FIELD_SEPARATOR, 2)
+    return product_id, int(variant_index) if variant_index else None, source
+
+
+def _entry(variant_index: Optional[int], source: str, quantity) -> dict:
+    return {"quantity": int(quantity), "source": source, "variantIndex": variant_index}
+
+
+async def read_cart(cart_key: str, legacy_key: str) -> Dict[str, str]:
+    """Returns the raw field -> quantity mapping of a cart."""
+    values = await get_scripts()["read"](keys=[cart_key, legacy_key], args=[CART_TTL_SECONDS])
+    return dict(zip(values[::2], values[1::2]))
+
+
+async def add_item(cart_key: str, legacy_key: str, product_id: str, variant_index: Optional[int], source: str, quantity: int) -> Tuple[str, Optional[dict]]:
+    """
+    Adds `quantity` to the line, creating it if needed. Returns ("added", entry), or ("full", None)
+    when the line is new and the cart already holds CART_MAX_LINES lines.
+    """
+    field = cart_field(product_id, variant_index, source)
+    result = await get_scripts()["add"](keys=[cart_key, legacy_key], args=[CART_TTL_SECONDS, CART_MAX_LINES, field, quantity])
+    return result[0], _entry(variant_index, source, result[1]) if len(result) > 1 else None
+
+
+async def update_item(cart_key: str, legacy_key: str, product_id: str, variant_index: Optional[int], source: str, quantity: int) -> Tuple[str, Optional[dict]]:
+    """
+    Sets the quantity of the line, removing it at 0. Returns (status, entry) where status is one of
+    updated, removed, missing_product, missing_variant or negative.
+    """
+    field = cart_field(product_id, variant_index, source)
+    result = await get_scripts()["update"](keys=[cart_key, legacy_key], args=[CART_TTL_SECONDS, field, product_id, quantity])
+    return result[0], _entry(variant_index, source, result[1]) if len(result) > 1 else None
+
+
+async def remove_item(cart_key: str, legacy_key: str, product_id: str, variant_index: Optional[int], source: str) -> Tuple[str, Optional[dict]]:
+    """Removes the line. Returns (status, entry) with status removed, missing_product or missing_variant."""
+    field = cart_field(product_id, variant_index, source)
+    result = await get_scripts()["remove"](keys=[cart_key, legacy_key], args=[CART_TTL_SECONDS, field, product_id])
+    return result[0], _entry(variant_index, source, result[1]) if len(result) > 1 else None
@@ -0,0 +1,103 @@
+import os
+import random
+from dotenv import load_dotenv
+from redis.exceptions import ResponseError
+from app.helpers.cart_scripts import CART_TTL_SECONDS, CART_MAX_LINES
+from app.helpers.redis_client import get_redis
+
+load_dotenv()
+# Matches both layouts: cart:v2:{user_id} and the legacy cart:{user_id}
+CART_KEY_PATTERN = "cart:*"
+CART_KEY_PREFIX = "cart:v2:"
+# Users allowed to call the admin endpoints, comma separated authorizer userIds
+CART_ADMIN_USER_IDS = {user_id.strip() for user_id in os.getenv("CART_ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+# Bounds on one stats call: keys walked by SCAN, and keys measured with MEMORY USAGE
+CART_STATS_SCAN_LIMIT = int(os.getenv("CART_STATS_SCAN_LIMIT", "100000"))
+CART_STATS_SAMPLE_SIZE = int(os.getenv("CART_STATS_SAMPLE_SIZE", "500"))
+SCAN_COUNT = 1000
+INFO_FIELDS = {
+    "memory": ["used_memory", "used_memory_peak", "maxmemory", "maxmemory_policy"],
+    "persistence": ["aof_enabled", "aof_current_size", "aof_base_size", "aof_rewrite_in_progress", "aof_last_rewrite_time_sec"],
+}
+
+
+async def _redis_info(client) -> dict:
+    info = {}
+    for section, fields in INFO_FIELDS.items():
+        try:
+            values = await client.info(section)
+        except ResponseError:
+            # Managed Redis deployments may rename or disable INFO
+            continue
+        info.update({field: values[field] for field in fields if field in values})
+    return info
+
+
+async def collect_cart_stats(scan_limit: int = CART_STATS_SCAN_LIMIT, sample_size: int = CART_STATS_SAMPLE_SIZE, cursor: int = 0) -> dict:
+    """
+    Counts cart keys with SCAN, starting at `cursor` and stopping after about `scan_limit` keys, and
+    measures a uniform random sample of them with MEMORY USAGE, HLEN and TTL. A scan that stops early
+    returns the cursor to continue from. SCAN may return a key twice, so counts are approximate.
+    """
+    client = get_redis()
+    carts = legacy_carts = scanned = 0
+    sample = []
+    while True:
+        cursor, keys = await client.scan(cursor=cursor, match=CART_KEY_PATTERN, count=SCAN_COUNT)
+        for key in keys:
+            scanned += 1
+            if key.startswith(CART_KEY_PREFIX):
+                carts += 1
+            else:
+                legacy_carts += 1
+            # Reservoir sampling keeps the sample uniform without holding every key
+            if len(sample) < sample_size:
+                sample.append(key)
+            else:
+                slot = random.randrange(scanned)
+                if slot < sample_size:
+                    sample[slot] = key
+        if cursor == 0 or scanned >= scan_limit:
+            break
+
+    pipe = client.pipeline(transaction=False)
+    for key in sample:
+        pipe.memory_usage(key)
+        pipe.hlen(key)
+        pipe.ttl(key)
+    # A cart:* key that is not a hash fails HLEN with WRONGTYPE, that must not fail the whole report
+    results = await pipe.execute(raise_on_error=False) if sample else []
+
+    sizes, lines, without_ttl, skipped = [], [], 0, 0
+    for index, key in enumerate(sample):
+        memory, length, ttl = results[index * 3:index * 3 + 3]
+        if any(isinstance(result, Exception) for result in (memory, length, ttl)):
+            skipped += 1
+            continue
+        # The key expired or was cleared between SCAN and the pipeline
+        if memory is None:
+            continue
+        sizes.append(memory)
+        if key.startswith(CART_KEY_PREFIX):
+            lines.append(length)
+        if ttl == -1:
+            without_ttl += 1
+
+    average_bytes = sum(sizes) / len(sizes) if sizes else 0
+    return {
+        "scan": {"keys_scanned": scanned, "complete": cursor == 0, "next_cursor": cursor},
+        "carts": carts,
+        "legacy_carts": legacy_carts,
+        "sample": {
+            "keys": len(sizes),
+            "avg_bytes": round(average_bytes),
+            "max_bytes": max(sizes, default=0),
+            "estimated_total_bytes": round(average_bytes * scanned),
+            "avg_lines": round(sum(lines) / len(lines), 1) if lines else 0,
+            "max_lines": max(lines, default=0),
+            "without_ttl": without_ttl,
+            "skipped": skipped,
+        },
+        "limits": {"ttl_seconds": CART_TTL_SECONDS, "max_lines": CART_MAX_LINES},
+        "redis": await _redis_info(client),
+    }
@@ -0,0 +1,47 @@
+import os
+import redis.asyncio as redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_HOST = os.getenv("REDIS_HOST", "redis-62ad01f163fa3b2a.elb.ap-southeast-2.amazonaws.com")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+# Upper bound on open connections per process; requests beyond it wait up to REDIS_POOL_TIMEOUT for one
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "2"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "1"))
+# Idle connections are PINGed before reuse once they have been quiet this many seconds
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+_client: redis.Redis | None = None
+
+
+def get_redis() -> redis.Redis:
+    """Returns the process-wide async Redis client, created on first use."""
+    global _client
+    if _client is None:
+        pool = redis.BlockingConnectionPool(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            socket_keepalive=True,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            retry_on_timeout=True,
+            decode_responses=True
+        )
+        _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        # The client does not own a pool it was handed, so close the pool explicitly
+        await _client.aclose(close_connection_pool=True)
+    _client = None
@@ -1,21 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Request, Query, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Query, Response, status
 from typing import Dict, Optional, List
-import redis
 import json
-from dotenv import load_dotenv
 from app.schemas import CartResponse, CartItemDetails, ProductSource, AddCartItemRequest
+from app.helpers.redis_client import get_redis
+from app.helpers import cart_scripts
+from app.helpers.cart_response import render_cart
+from app.helpers import cart_stats
 from pydantic import BaseModel, ValidationError
-import os
 
-load_dotenv()
 router = APIRouter(prefix="/cart")
 
-# Redis connection
-
-REDIS_HOST = os.getenv("REDIS_HOST")
-print(REDIS_HOST)
-redis_client = redis.Redis(host="redis-62ad01f163fa3b2a.elb.ap-southeast-2.amazonaws.com", port=6379, db=0, decode_responses=True)
-
 def extract_user_id_from_event(request: Request) -> str:
     event = request.scope.get("aws.event", {})
     authorizer = event.get("requestContext", {}).get("authorizer", {})
@@ -27,6 +21,11 @@ def extract_user_id_from_event(request: Request) -> str:
     return user_id
 
 def get_cart_key(user_id: str) -> str:
+    # One hash field per line, see app.helpers.cart_scripts
+    return f"cart:v2:{user_id}"
+
+def get_legacy_cart_key(user_id: str) -> str:
+    # Carts stored as one JSON list per product, migrated on first touch
     return f"cart:{user_id}"
 
 # Helper function to find a variant in a list
@@ -36,14 +35,6 @@ def find_variant_index(items: List[Dict], variant_index: Optional[int]) -> int:
             return i
     return -1
 
-# Helper function to find a variant in a list by index AND source
-def find_variant_index_and_source(items: List[Dict], variant_index: Optional[int], source: ProductSource) -> int:
-    for i, item in enumerate(items):
-        # Check both variantIndex and source match
-        if item.get("variantIndex") == variant_index and item.get("source") == source.value:
-            return i
-    return -1
-
 # Helper function to parse cart items from Redis
 def parse_cart_items(items_json_list: List[str]) -> List[CartItemDetails]:
     parsed_items = []
@@ -56,6 +47,11 @@ def parse_cart_items(items_json_list: List[str]) -> List[CartItemDetails]:
             continue # Skip corrupted items
     return parsed_items
 
+def require_admin(x_user_id: str = Depends(extract_user_id_from_event)) -> str:
+    if x_user_id not in cart_stats.CART_ADMIN_USER_IDS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return x_user_id
+
 @router.get("/debug")
 async def debug_headers(request: Request):
     print(dict(request.headers))
@@ -65,38 +61,10 @@ async def debug_headers(request: Request):
 async def get_cart(x_user_id: str = Depends(extract_user_id_from_event)):
     """Get the contents of a user's cart, supporting variants."""
     cart_key = get_cart_key(x_user_id)
-    cart_data_raw = redis_client.hgetall(cart_key)
-
-    cart_items_response: Dict[str, List[CartItemDetails]] = {}
-    if cart_data_raw:
-        for product_id, items_json in cart_data_raw.items():
-            try:
-                # items_json is expected to be a JSON string of a list of variant dicts
-                items_list = json.loads(items_json)
-                if not isinstance(items_list, list):
-                    # Handle potential data corruption if it's not a list
-                    # Optionally log this error
-                    continue # Skip this product_id
+    cart_data_raw = await cart_scripts.read_cart(cart_key, get_legacy_cart_key(x_user_id))
 
-                product_variants = []
-                for item_data in items_list:
-                     # Validate each item against the Pydantic model
-                    try:
-                        product_variants.append(CartItemDetails(**item_data))
-                    except (TypeError, KeyError, ValidationError):
-                        # Handle cases where individual variant data is corrupted
-                        # Optionally log this error
-                        continue # Skip corrupted variant item
-                
-                if product_variants: # Only add if there are valid variants
-                    cart_items_response[product_id] = product_variants
-
-            except (json.JSONDecodeError, TypeError):
-                # Handle cases where the entire value for a product_id is corrupted
-                # Optionally log this error
-                continue # Skip corrupted product_id entry
-
-    return CartResponse(items=cart_items_response)
+    # Lines were validated when written; the body is assembled directly, skipping malformed lines
+    return Response(content=render_cart(cart_data_raw), media_type="application/json")
 
 @router.post("/items/{product_id}")
 async def add_to_cart(
@@ -106,44 +74,13 @@ async def add_to_cart(
 ):
     """Add an item/variant to the cart. If item with same variantIndex and source exists, update quantity. Otherwise, add as a new entry."""
     cart_key = get_cart_key(x_user_id)
-    
-    existing_items_json = redis_client.hget(cart_key, product_id)
-    variants: List[Dict] = [] 
-    if existing_items_json:
-        try:
-            variants = json.loads(existing_items_json)
-            if not isinstance(variants, list): 
-                variants = [] 
-        except json.JSONDecodeError:
-            variants = [] 
-            
-    # Find if the specific variant (matched by variantIndex AND source) already exists
-    # Use the new helper function
-    exact_match_index = find_variant_index_and_source(variants, item_data.variantIndex, item_data.source)
-
-    if exact_match_index != -1:
-        # Exact match found (same product, variantIndex, and source), update quantity
-        variants[exact_match_index]["quantity"] += item_data.quantity
-    else:
-         # No exact match found, add as a new variant entry
-        variants.append({
-            "quantity": item_data.quantity,
-            "source": item_data.source.value,
-            "variantIndex": item_data.variantIndex
-        })
 
-    redis_client.hset(cart_key, product_id, json.dumps(variants))
-
-    # Find the specific item added/updated for the response
-    response_detail = None
-    if exact_match_index != -1:
-        response_detail = variants[exact_match_index]
-    else:
-        # Find the newly added item (it will be the last one with matching variantIndex and source)
-         for variant in reversed(variants):
-             if variant.get("variantIndex") == item_data.variantIndex and variant.get("source") == item_data.source.value:
-                 response_detail = variant
-                 break
+    # A single HINCRBY on the line's field, atomic inside Redis
+    script_status, response_detail = await cart_scripts.add_item(
+        cart_key, get_legacy_cart_key(x_user_id), product_id, item_data.variantIndex, item_data.source.value, item_data.quantity
+    )
+    if script_status == "full":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cart cannot hold more than {cart_scripts.CART_MAX_LINES} lines")
 
     return {"message": "Item added/updated in cart", "product_id": product_id, "details": response_detail}
 
@@ -158,6 +95,16 @@ class RemoveItemRequestBody(BaseModel):
     variantIndex: Optional[int] = None
     source: ProductSource
 
+def raise_for_script_status(script_status: str, variantIndex: Optional[int], source: ProductSource):
+    """Turns the failure statuses of the update/remove scripts into the errors the API has always returned."""
+    if script_status == "missing_product":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found in cart")
+    if script_status == "missing_variant":
+        v_idx_str = str(variantIndex) if variantIndex is not None else "null"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Specific variant with index {v_idx_str} and source '{source.value}' not found in cart for this product")
+    if script_status == "negative":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Quantity cannot be negative")
+
 @router.patch("/items/{product_id}")
 async def update_cart_item(
     product_id: str,
@@ -170,61 +117,27 @@ async def update_cart_item(
     The request body must contain 'variantIndex' (nullable), 'source', and 'quantity'.
     """
     cart_key = get_cart_key(x_user_id)
-    existing_items_json = redis_client.hget(cart_key, product_id)
 
     # Extract identification and update data from body
     variantIndex = update_data.variantIndex
     source = update_data.source
     new_quantity = update_data.quantity
 
-    if not existing_items_json:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found in cart")
-
-    try:
-        variants = json.loads(existing_items_json)
-        if not isinstance(variants, list):
-             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cart item data is corrupted")
-    except (json.JSONDecodeError, TypeError):
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error reading cart item data")
-
-    # Find the specific variant to update using variantIndex (nullable) and source from body
-    variant_match_index = find_variant_index_and_source(variants, variantIndex, source)
-
-    if variant_match_index == -1:
-         # Adjust detail message slightly for nullable index
-         v_idx_str = str(variantIndex) if variantIndex is not None else "null"
-         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Specific variant with index {v_idx_str} and source '{source.value}' not found in cart for this product")
+    # Sets or removes the line's field in one atomic step; a zero quantity removes it
+    script_status, variant = await cart_scripts.update_item(cart_key, get_legacy_cart_key(x_user_id), product_id, variantIndex, source.value, new_quantity)
+    raise_for_script_status(script_status, variantIndex, source)
 
-    target_variant = variants[variant_match_index]
-
-    # --- Handle Quantity Update ---
-    if new_quantity < 0:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Quantity cannot be negative")
-
-    if new_quantity == 0:
-        # Remove this specific variant from the list
-        removed_details = variants.pop(variant_match_index)
+    if script_status == "removed":
+        v_idx_str = str(variantIndex) if variantIndex is not None else "null"
         message = f"Item variant (index: {v_idx_str}, source: {source.value}) removed via zero quantity update"
-        # If list is now empty, remove the product from the cart hash
-        if not variants:
-            redis_client.hdel(cart_key, product_id)
-        else:
-            # Update redis with the modified list (item removed)
-            redis_client.hset(cart_key, product_id, json.dumps(variants))
         # Return message and what was removed (consistent with DELETE)
         return {
             "message": message,
-            "removed_item": CartItemDetails(**removed_details).model_dump()
+            "removed_item": CartItemDetails(**variant).model_dump()
         }
 
-    # Update the quantity for the target variant
-    target_variant["quantity"] = new_quantity
-
-    # Update the item list in Redis with the new quantity
-    redis_client.hset(cart_key, product_id, json.dumps(variants))
-
     # Return the updated variant details
-    updated_variant_details = CartItemDetails(**target_variant)
+    updated_variant_details = CartItemDetails(**variant)
 
     return {
         "message": "Cart item quantity updated",
@@ -245,39 +158,14 @@ async def remove_from_cart(
     Note: Using a body for DELETE is non-standard practice.
     """
     cart_key = get_cart_key(x_user_id)
-    existing_items_json = redis_client.hget(cart_key, product_id)
 
     # Extract identification data from body
     variantIndex = remove_data.variantIndex
     source = remove_data.source
 
-    if not existing_items_json:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found in cart")
-
-    try:
-        variants = json.loads(existing_items_json)
-        if not isinstance(variants, list):
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Cart item data is corrupted")
-    except (json.JSONDecodeError, TypeError):
-         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error reading cart item data")
-
-    # Find the specific variant to delete using variantIndex (nullable) and source from body
-    variant_match_index = find_variant_index_and_source(variants, variantIndex, source)
-
-    # Check if the specific variant was found
-    if variant_match_index == -1:
-         v_idx_str = str(variantIndex) if variantIndex is not None else "null"
-         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Specific variant with index {v_idx_str} and source '{source.value}' not found in cart for this product")
-
-    # Remove the variant from the list
-    deleted_item_details = variants.pop(variant_match_index)
-
-    # If the list is now empty, remove the product key from the cart hash
-    if not variants:
-        redis_client.hdel(cart_key, product_id)
-    else:
-        # Otherwise, update the list in Redis
-        redis_client.hset(cart_key, product_id, json.dumps(variants))
+    # Removes the line's field in one atomic step
+    script_status, deleted_item_details = await cart_scripts.remove_item(cart_key, get_legacy_cart_key(x_user_id), product_id, variantIndex, source.value)
+    raise_for_script_status(script_status, variantIndex, source)
 
     # Return a confirmation message, including details of the removed item
     return {
@@ -289,5 +177,16 @@ async def remove_from_cart(
 async def clear_cart(x_user_id: str = Depends(extract_user_id_from_event)):
     """Clear all items from the cart"""
     cart_key = get_cart_key(x_user_id)
-    redis_client.delete(cart_key) # This remains the same, deletes the whole user cart hash
-    return {"message": "Cart cleared"} 
\ No newline at end of file
+    await get_redis().delete(cart_key, get_legacy_cart_key(x_user_id)) # Deletes the whole user cart hash, in either layout
+    return {"message": "Cart cleared"} 
+
+@router.get("/admin/stats")
+async def get_cart_stats(
+    scan_limit: int = Query(cart_stats.CART_STATS_SCAN_LIMIT, gt=0, description="Stop after scanning about this many cart keys"),
+    sample_size: int = Query(cart_stats.CART_STATS_SAMPLE_SIZE, gt=0, le=10000, description="Cart keys measured with MEMORY USAGE"),
+    cursor: int = Query(0, ge=0, description="SCAN cursor returned by a previous call that did not complete"),
+    admin_id: str = Depends(require_admin)
+):
+    """Cart counts and memory use, sampled over a SCAN of the cart keys."""
+    stats = await cart_stats.collect_cart_stats(scan_limit, sample_size, cursor)
+    return {"message": "Cart statistics", "payload": stats}
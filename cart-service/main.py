@@ -1,7 +1,10 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from redis.exceptions import RedisError
 from app.routers import cart
 from app.routers import health_check
+from app.helpers.redis_client import close_redis
 from mangum import Mangum
 app = FastAPI(title="Cart Service")
 
@@ -19,4 +22,17 @@ app.include_router(cart.router)
 app.include_router(health_check.router)
 
 
-handler = Mangum(app)
\ No newline at end of file
+# With socket timeouts a slow or unreachable Redis fails the request instead of stalling the worker
+@app.exception_handler(RedisError)
+async def redis_error_handler(request: Request, exc: RedisError):
+    print(f"Redis error on {request.url.path}: {exc!r}")
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "Cart storage is unavailable"})
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_redis()
+
+
+# Mangum would run the lifespan around every invocation, closing the Redis pool after each request
+handler = Mangum(app, lifespan="off")
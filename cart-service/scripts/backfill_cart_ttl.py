@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+
+
+async def backfill(ttl: int, dry_run: bool, batch_size: int) -> dict:
+    """Gives every cart key without an expiry one, so abandoned carts written before the sliding TTL age out too."""
+    # Imported late so REDIS_* settings from the environment apply
+    from app.helpers.cart_stats import CART_KEY_PATTERN
+    from app.helpers.redis_client import get_redis, close_redis
+
+    client = get_redis()
+    scanned = updated = 0
+    cursor = 0
+    try:
+        while True:
+            cursor, keys = await client.scan(cursor=cursor, match=CART_KEY_PATTERN, count=batch_size)
+            if keys:
+                scanned += len(keys)
+                pipe = client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.ttl(key)
+                persistent = [key for key, key_ttl in zip(keys, await pipe.execute()) if key_ttl == -1]
+                if persistent and not dry_run:
+                    pipe = client.pipeline(transaction=False)
+                    for key in persistent:
+                        pipe.expire(key, ttl)
+                    await pipe.execute()
+                updated += len(persistent)
+            if cursor == 0:
+                break
+    finally:
+        await close_redis()
+    return {"scanned": scanned, "without_ttl": updated, "updated": 0 if dry_run else updated}
+
+
+def main():
+    from app.helpers.cart_scripts import CART_TTL_SECONDS
+
+    parser = argparse.ArgumentParser(description="Set an expiry on cart keys that have none, e.g. legacy carts never touched since the sliding TTL.")
+    parser.add_argument("--ttl", type=int, default=CART_TTL_SECONDS, help="Expiry in seconds, defaults to CART_TTL_SECONDS")
+    parser.add_argument("--batch-size", type=int, default=1000, help="SCAN COUNT hint per round-trip")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the keys without an expiry")
+    args = parser.parse_args()
+    if args.ttl <= 0:
+        raise SystemExit("--ttl must be positive")
+    print(asyncio.run(backfill(args.ttl, args.dry_run, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
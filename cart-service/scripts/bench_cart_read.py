@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+from fastapi import Depends, FastAPI
+from pydantic import ValidationError
+
+SOURCES = ["Ex-china", "Ex-india custom", "doorstep delivery"]
+
+
+def make_cart(lines: int, corrupt_every: int) -> Dict[str, str]:
+    """Field -> quantity mapping as HGETALL returns it, a few variants per product."""
+    cart = {}
+    for line in range(lines):
+        variant_index = "" if line % 4 == 0 else str(line % 4)
+        field = f"{line // 3:024x}|{variant_index}|{SOURCES[line % 3]}"
+        cart[field] = "oops" if corrupt_every and line % corrupt_every == corrupt_every - 1 else str(1 + line % 7)
+    return cart
+
+
+def build_apps(holder: dict):
+    # Imported here so the bench can swap the Redis read for an in-memory cart
+    from app.helpers import cart_scripts
+    from app.routers import cart
+    from app.schemas import CartItemDetails, CartResponse
+
+    async def read_cart(cart_key: str, legacy_key: str):
+        return holder["cart"]
+
+    cart_scripts.read_cart = read_cart
+
+    fast = FastAPI()
+    fast.include_router(cart.router)
+    fast.dependency_overrides[cart.extract_user_id_from_event] = lambda: "bench"
+
+    # The read path before the fast path: one CartItemDetails per line, then response_model validation
+    legacy = FastAPI()
+
+    @legacy.get("/cart/", response_model=CartResponse)
+    async def get_cart(x_user_id: str = Depends(cart.extract_user_id_from_event)):
+        cart_data_raw = await cart_scripts.read_cart(cart.get_cart_key(x_user_id), cart.get_legacy_cart_key(x_user_id))
+        cart_items_response: Dict[str, List[CartItemDetails]] = {}
+        for field, quantity in cart_data_raw.items():
+            try:
+                product_id, variant_index, source = cart_scripts.parse_field(field)
+                item = CartItemDetails(quantity=int(quantity), source=source, variantIndex=variant_index)
+            except (ValueError, ValidationError):
+                continue
+            cart_items_response.setdefault(product_id, []).append(item)
+        return CartResponse(items=cart_items_response)
+
+    legacy.dependency_overrides[cart.extract_user_id_from_event] = lambda: "bench"
+    return legacy, fast
+
+
+async def call(app, path: str = "/cart/") -> bytes:
+    """One GET through the ASGI app without an HTTP client in the way."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(app, iterations: int) -> float:
+    """Median microseconds per request over `iterations` calls, after a short warm-up."""
+    for _ in range(20):
+        await call(app)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await call(app)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+async def run(sizes: List[int], iterations: int, corrupt_every: int):
+    holder = {}
+    legacy, fast = build_apps(holder)
+    print(f"{'lines':>6s} {'pydantic (us)':>14s} {'fast path (us)':>15s} {'speedup':>8s}  identical body")
+    for size in sizes:
+        holder["cart"] = make_cart(size, corrupt_every)
+        legacy_body, fast_body = await call(legacy), await call(fast)
+        identical = json.loads(legacy_body) == json.loads(fast_body) and legacy_body == fast_body
+        legacy_us = await measure(legacy, iterations)
+        fast_us = await measure(fast, iterations)
+        print(f"{size:6d} {legacy_us:14.1f} {fast_us:15.1f} {legacy_us / fast_us:7.1f}x  {identical}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-line Pydantic cart read with the fast path, without Redis.")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma separated cart sizes in lines")
+    parser.add_argument("--iterations", type=int, default=500, help="Requests measured per size and path")
+    parser.add_argument("--corrupt-every", type=int, default=0, help="Make every n-th line unparseable (0 disables)")
+    args = parser.parse_args()
+    asyncio.run(run([int(size) for size in args.sizes.split(",")], args.iterations, args.corrupt_every))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+import redis
+import redis.asyncio as aioredis
+
+BENCH_PREFIX = "bench:cart:"
+
+
+def percentiles(samples: list) -> tuple:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+def seed(redis_url: str, users: int, lines: int):
+    """Fills one cart per simulated user, shaped like the cart:{user_id} hashes."""
+    client = redis.Redis.from_url(redis_url)
+    pipe = client.pipeline(transaction=False)
+    for user in range(users):
+        key = f"{BENCH_PREFIX}{user}"
+        pipe.delete(key)
+        for line in range(lines):
+            pipe.hset(key, f"product-{line}", json.dumps([{"quantity": 1, "source": "Ex-china", "variantIndex": 0}]))
+    pipe.execute()
+    client.close()
+
+
+def cleanup(redis_url: str, users: int):
+    client = redis.Redis.from_url(redis_url)
+    client.delete(*[f"{BENCH_PREFIX}{user}" for user in range(users)])
+    client.close()
+
+
+async def run_sync(redis_url: str, total: int, concurrency: int, users: int, read_ratio: float) -> list:
+    """Old behaviour: a blocking redis.Redis client called straight from async handlers."""
+    client = redis.Redis.from_url(redis_url, decode_responses=True)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            key = f"{BENCH_PREFIX}{i % users}"
+            start = time.perf_counter()
+            if (i % 100) < read_ratio * 100:
+                client.hgetall(key)
+            else:
+                raw = client.hget(key, "product-0")
+                variants = json.loads(raw) if raw else []
+                client.hset(key, "product-0", json.dumps(variants))
+            # Yield like a real handler would between requests
+            await asyncio.sleep(0)
+            return time.perf_counter() - start
+
+    try:
+        return await asyncio.gather(*[one(i) for i in range(total)])
+    finally:
+        client.close()
+
+
+async def run_async(redis_url: str, total: int, concurrency: int, users: int, read_ratio: float, max_connections: int) -> list:
+    """New behaviour: redis.asyncio with a bounded blocking pool, as in app.helpers.redis_client."""
+    pool = aioredis.BlockingConnectionPool.from_url(
+        redis_url, max_connections=max_connections, timeout=5, health_check_interval=30, decode_responses=True
+    )
+    client = aioredis.Redis(connection_pool=pool)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            key = f"{BENCH_PREFIX}{i % users}"
+            start = time.perf_counter()
+            if (i % 100) < read_ratio * 100:
+                await client.hgetall(key)
+            else:
+                raw = await client.hget(key, "product-0")
+                variants = json.loads(raw) if raw else []
+                await client.hset(key, "product-0", json.dumps(variants))
+            return time.perf_counter() - start
+
+    try:
+        return await asyncio.gather(*[one(i) for i in range(total)])
+    finally:
+        await client.aclose(close_connection_pool=True)
+
+
+def start_latency_proxy(redis_url: str, latency: float) -> str:
+    """
+    Forwards to Redis with `latency` seconds added to each request, standing in for the network hop
+    to the load balancer in front of the production Redis. Runs on its own thread and event loop so
+    the blocking client cannot stall it. Returns the URL to connect to.
+    """
+    target = urlsplit(redis_url)
+    ready = threading.Event()
+    address = {}
+
+    async def pipe(reader, writer, delay: float):
+        try:
+            while data := await reader.read(65536):
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(target.hostname, target.port or 6379)
+        await asyncio.gather(pipe(client_reader, server_writer, latency), pipe(server_reader, client_writer, 0))
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        address["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return urlunsplit((target.scheme, f"127.0.0.1:{address['port']}", target.path, target.query, target.fragment))
+
+
+async def stall_probe(runner, interval: float = 0.005) -> tuple:
+    """Runs `runner` while a ticker measures how late the event loop wakes it, i.e. how long other requests stall."""
+    loop = asyncio.get_running_loop()
+    delays = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            delays.append(loop.time() - expected)
+
+    task = asyncio.create_task(ticker())
+    try:
+        samples = await runner()
+    finally:
+        done.set()
+        await task
+    return samples, max(delays) * 1000 if delays else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a blocking and an async Redis client under concurrent cart requests.")
+    parser.add_argument("--requests", type=int, default=20000, help="Total number of simulated requests per run")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent in-flight requests")
+    parser.add_argument("--users", type=int, default=1000, help="Distinct carts")
+    parser.add_argument("--lines", type=int, default=20, help="Products per seeded cart")
+    parser.add_argument("--read-ratio", type=float, default=0.8, help="Share of requests that read the whole cart, the rest add an item")
+    parser.add_argument("--max-connections", type=int, default=50, help="Pool size for the async run")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Round-trip latency added by a local proxy, 0 talks to Redis directly")
+    args = parser.parse_args()
+
+    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    seed(redis_url, args.users, args.lines)
+    print(f"Seeded {args.users} carts of {args.lines} lines under {BENCH_PREFIX}*")
+    bench_url = start_latency_proxy(redis_url, args.latency_ms / 1000) if args.latency_ms else redis_url
+
+    try:
+        for name, runner in (
+            ("sync client", lambda: run_sync(bench_url, args.requests, args.concurrency, args.users, args.read_ratio)),
+            (f"async pool ({args.max_connections})", lambda: run_async(
+                bench_url, args.requests, args.concurrency, args.users, args.read_ratio, args.max_connections
+            )),
+        ):
+            start = time.perf_counter()
+            samples, stall = asyncio.run(stall_probe(runner))
+            elapsed = time.perf_counter() - start
+            p50, p99 = percentiles(samples)
+            print(f"{name:22s} p50={p50:7.2f}ms  p99={p99:7.2f}ms  throughput={len(samples) / elapsed:8.1f} req/s  "
+                  f"max loop stall={stall:7.2f}ms")
+    finally:
+        cleanup(redis_url, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+CART_KEY = "cart:v2:contention-check"
+LEGACY_CART_KEY = "cart:contention-check"
+SOURCES = ["Ex-china", "Ex-india custom", "doorstep delivery"]
+
+
+def expect(condition: bool, message: str):
+    print(("ok   " if condition else "FAIL ") + message)
+    return condition
+
+
+async def read_modify_write(redis_client, product_id: str, variant_index: int, source: str, quantity: int):
+    """The add_to_cart flow before the Lua scripts: HGET, edit the JSON list in Python, HSET."""
+    raw = await redis_client.hget(LEGACY_CART_KEY, product_id)
+    variants = json.loads(raw) if raw else []
+    for variant in variants:
+        if variant.get("variantIndex") == variant_index and variant.get("source") == source:
+            variant["quantity"] += quantity
+            break
+    else:
+        variants.append({"quantity": quantity, "source": source, "variantIndex": variant_index})
+    await redis_client.hset(LEGACY_CART_KEY, product_id, json.dumps(variants))
+
+
+async def run(mode: str, adds: int, concurrency: int, products: int, variants: int) -> tuple:
+    # Imported late so they pick up the Redis host set in main()
+    from app.helpers import cart_scripts
+    from app.helpers.redis_client import get_redis
+
+    redis_client = get_redis()
+    await redis_client.delete(CART_KEY, LEGACY_CART_KEY)
+    semaphore = asyncio.Semaphore(concurrency)
+    expected = {}
+
+    async def one(i: int):
+        product_id = f"product-{i % products}"
+        variant_index = (i // products) % variants
+        source = SOURCES[i % len(SOURCES)]
+        quantity = 1 + i % 3
+        slot = (product_id, variant_index, source)
+        expected[slot] = expected.get(slot, 0) + quantity
+        async with semaphore:
+            if mode == "lua":
+                await cart_scripts.add_item(CART_KEY, LEGACY_CART_KEY, product_id, variant_index, source, quantity)
+            else:
+                await read_modify_write(redis_client, product_id, variant_index, source, quantity)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(adds)])
+    elapsed = time.perf_counter() - start
+
+    actual = {}
+    if mode == "lua":
+        for field, quantity in (await cart_scripts.read_cart(CART_KEY, LEGACY_CART_KEY)).items():
+            actual[cart_scripts.parse_field(field)] = int(quantity)
+    else:
+        for product_id, raw in (await redis_client.hgetall(LEGACY_CART_KEY)).items():
+            for variant in json.loads(raw):
+                slot = (product_id, variant["variantIndex"], variant["source"])
+                actual[slot] = actual.get(slot, 0) + variant["quantity"]
+    await redis_client.delete(CART_KEY, LEGACY_CART_KEY)
+    lost = sum(expected.values()) - sum(actual.values())
+    wrong = sum(1 for slot, quantity in expected.items() if actual.get(slot) != quantity)
+    return adds / elapsed, lost, wrong, len(expected)
+
+
+async def check(args) -> bool:
+    from app.helpers.redis_client import close_redis
+
+    passed = True
+    try:
+        for mode in ("read-modify-write", "lua"):
+            throughput, lost, wrong, slots = await run(mode, args.adds, args.concurrency, args.products, args.variants)
+            print(f"{mode:18s} {throughput:8.1f} adds/s  lost quantity={lost}  wrong lines={wrong}/{slots}")
+            if mode == "lua":
+                passed &= expect(lost == 0 and wrong == 0, "every parallel add is reflected in the final quantities")
+    finally:
+        await close_redis()
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire parallel adds into one buyer's cart and check the final quantities.")
+    parser.add_argument("--adds", type=int, default=5000, help="Total add_to_cart calls")
+    parser.add_argument("--concurrency", type=int, default=100, help="Adds in flight at once")
+    parser.add_argument("--products", type=int, default=5, help="Distinct products, fewer means more contention")
+    parser.add_argument("--variants", type=int, default=2, help="Variant indexes per product")
+    args = parser.parse_args()
+
+    os.environ.setdefault("REDIS_HOST", "localhost")
+    if not asyncio.run(check(args)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Header, Path, Body, status, Request
 from mongoengine.errors import ValidationError as MongoValidationError
-from bson import json_util
-import json
 from bson.objectid import ObjectId
 import requests
 from jose import jwt, JWTError
 from app.helpers import email_helper
+from app.helpers.bson_json import MongoJSONResponse
 from app.models import Order, OrderDetails
 from datetime import datetime
 import os
@@ -37,12 +36,10 @@ async def get_orders(x_user_id: str = Depends(extract_user_id_from_event)):
             return {"message": "No orders found", "payload": []}
 
         # Convert each Order object to a MongoDB document dict
-        serialized_orders = json.loads(json_util.dumps([order.to_mongo() for order in orders]))
-
-        return {
+        return MongoJSONResponse({
             "message": "Successfully retrieved orders",
-            "payload": serialized_orders
-        }
+            "payload": [order.to_mongo() for order in orders]
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -191,10 +188,10 @@ async def create_order(
         )
 
         order.save()
-        return {
+        return MongoJSONResponse({
             "message": "Order created successfully",
-            "payload": json.loads(json_util.dumps(order.to_mongo()))
-        }
+            "payload": order.to_mongo()
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -210,12 +207,10 @@ async def get_order_by_id(order_id: str, x_user_id: str = Depends(extract_user_i
         if not order:
             return {"message": "Order not found or not authorized", "payload": {}}
 
-        serialized_order = json.loads(json_util.dumps(order.to_mongo()))
-
-        return {
+        return MongoJSONResponse({
             "message": "Successfully retrieved order",
-            "payload": serialized_order
-        }
+            "payload": order.to_mongo()
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -301,10 +296,10 @@ async def update_payment_status(
         order.paidDate = datetime.utcnow()
         order.save()
 
-        return {
+        return MongoJSONResponse({
             "message": "Payment status updated successfully",
-            "payload": json.loads(json_util.dumps(order.to_mongo()))
-        }
+            "payload": order.to_mongo()
+        })
 
     except HTTPException:
         raise
@@ -322,12 +317,10 @@ async def admin_get_orders(user_id: str):
             return {"message": "No orders found", "payload": []}
 
         # Convert each Order object to a MongoDB document dict
-        serialized_orders = json.loads(json_util.dumps([order.to_mongo() for order in orders]))
-
-        return {
+        return MongoJSONResponse({
             "message": "Successfully retrieved orders",
-            "payload": serialized_orders
-        }
+            "payload": [order.to_mongo() for order in orders]
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -344,13 +337,11 @@ async def admin_get_order_by_id(order_id: str = Path(..., description="MongoDB O
         if not order:
             raise HTTPException(status_code=404, detail="Order not found")
 
-        # Serialize the order to a dictionary suitable for JSON response
-        serialized_order = json.loads(json_util.dumps(order.to_mongo()))
-
-        return {
+        # Serialize the order straight to the response bytes
+        return MongoJSONResponse({
             "message": "Successfully retrieved order",
-            "payload": serialized_order
-        }
+            "payload": order.to_mongo()
+        })
 
     except HTTPException:
         # Re-raise HTTPException to preserve status code and detail
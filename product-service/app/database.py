@@ -1,19 +1,87 @@
-from pymongo import MongoClient
-import certifi
 import os
+import threading
 from dotenv import load_dotenv
 load_dotenv()
 username = os.getenv("DB_USER")
 password = os.getenv("DB_PASSWORD")
 host_address = os.getenv("DB_HOST")
 database = os.getenv("DB_NAME")
-mongo_url = f"mongodb+srv://{username}:{password}@{host_address}/{database}"
-print("DB_USER:", username)
-print("DB_HOST:", host_address)
-print("Constructed Mongo URI:", mongo_url)
+# MONGO_URL overrides the Atlas URI, e.g. to run scripts against a local mongod
+local_mongo_url = os.getenv("MONGO_URL")
+mongo_url = local_mongo_url or f"mongodb+srv://{username}:{password}@{host_address}/{database}"
 
-mongo_client = MongoClient(mongo_url, tlsCAFile=certifi.where())
 
-db = mongo_client[database]
+def _client_options() -> dict:
+    # Pool settings shared by the sync and async clients
+    options = {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000")),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primaryPreferred"),
+    }
+    # Atlas needs the certifi bundle; a local mongod usually runs without TLS
+    if not local_mongo_url:
+        import certifi
+        options["tlsCAFile"] = certifi.where()
+    return options
 
-demo_db=mongo_client["DEMO_PRODUCTS"]
\ No newline at end of file
+
+class _Lazy:
+    """
+    Stands in for a client or database and creates it on first use. Importing this module
+    therefore costs neither the pymongo import nor the SRV lookup and TLS handshake with Atlas,
+    which keeps them off the Lambda cold start for requests that never touch Mongo.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._target is not None
+
+    def get(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+
+    def __getitem__(self, name):
+        return self.get()[name]
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def _create_sync_client():
+    from pymongo import MongoClient
+    return MongoClient(mongo_url, **_client_options())
+
+
+def _create_async_client():
+    from pymongo import AsyncMongoClient
+    return AsyncMongoClient(mongo_url, **_client_options())
+
+
+# Sync client: scripts, background index builds and the change stream listener
+mongo_client = _Lazy(_create_sync_client)
+
+db = _Lazy(lambda: mongo_client[database])
+
+demo_db = _Lazy(lambda: mongo_client["DEMO_PRODUCTS"])
+
+# Async client: used by the request handlers so they never block a worker on Atlas
+async_mongo_client = _Lazy(_create_async_client)
+
+async_db = _Lazy(lambda: async_mongo_client[database])
+
+async_demo_db = _Lazy(lambda: async_mongo_client["DEMO_PRODUCTS"])
+
+
+async def close_async_client():
+    """Closes the async client if a request ever created it."""
+    if async_mongo_client.initialized:
+        await async_mongo_client.close()
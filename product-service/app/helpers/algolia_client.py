@@ -0,0 +1,125 @@
+import os
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import httpx
+
+load_dotenv()
+ALGOLIA_APP_ID = os.getenv("ALGOLIA_ID")
+ALGOLIA_API_KEY = os.getenv("ALGOLIA_ADMIN_KEY")
+INDEX_NAME = "product_index"
+
+# Override to point the service at a stand-in server (benchmarks, local dev)
+ALGOLIA_BASE_URL = os.getenv("ALGOLIA_BASE_URL", f"https://{ALGOLIA_APP_ID}-dsn.algolia.net")
+# The -dsn hosts only serve reads, indexing goes to the main host
+ALGOLIA_WRITE_URL = os.getenv("ALGOLIA_WRITE_URL", os.getenv("ALGOLIA_BASE_URL", f"https://{ALGOLIA_APP_ID}.algolia.net"))
+
+# Connection pool and timeout tuning
+ALGOLIA_TIMEOUT = float(os.getenv("ALGOLIA_TIMEOUT", "5"))
+ALGOLIA_CONNECT_TIMEOUT = float(os.getenv("ALGOLIA_CONNECT_TIMEOUT", "2"))
+ALGOLIA_MAX_CONNECTIONS = int(os.getenv("ALGOLIA_MAX_CONNECTIONS", "50"))
+ALGOLIA_MAX_KEEPALIVE = int(os.getenv("ALGOLIA_MAX_KEEPALIVE", "20"))
+ALGOLIA_KEEPALIVE_EXPIRY = float(os.getenv("ALGOLIA_KEEPALIVE_EXPIRY", "60"))
+ALGOLIA_HTTP2 = os.getenv("ALGOLIA_HTTP2", "false").lower() in ("1", "true", "yes")
+
+_client: "httpx.AsyncClient | None" = None
+
+
+class AlgoliaError(Exception):
+    """Algolia could not be reached or answered with a transport-level error."""
+
+
+def get_client() -> "httpx.AsyncClient":
+    """Returns the process-wide Algolia client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        # Imported here so a cold start that never calls Algolia does not pay for httpx
+        import httpx
+        _client = httpx.AsyncClient(
+            base_url=ALGOLIA_BASE_URL,
+            headers={
+                "X-Algolia-API-Key": ALGOLIA_API_KEY or "",
+                "X-Algolia-Application-Id": ALGOLIA_APP_ID or "",
+                "Content-Type": "application/json"
+            },
+            http2=ALGOLIA_HTTP2,
+            timeout=httpx.Timeout(ALGOLIA_TIMEOUT, connect=ALGOLIA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=ALGOLIA_MAX_CONNECTIONS,
+                max_keepalive_connections=ALGOLIA_MAX_KEEPALIVE,
+                keepalive_expiry=ALGOLIA_KEEPALIVE_EXPIRY
+            )
+        )
+    return _client
+
+
+async def close_client():
+    """Closes the pooled client. Called on application shutdown."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+async def _post(path: str, payload: dict, timeout: float | None = None) -> dict:
+    import httpx
+    try:
+        response = await get_client().post(
+            path,
+            json=payload,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+    except httpx.HTTPError as e:
+        raise AlgoliaError(str(e)) from e
+    # Gateways in front of Algolia answer 5xx with HTML, callers only know how to read its JSON errors
+    if response.status_code >= 500:
+        raise AlgoliaError(f"Algolia returned HTTP {response.status_code}")
+    try:
+        return response.json()
+    except ValueError as e:
+        raise AlgoliaError(f"Algolia returned HTTP {response.status_code} with a body that is not JSON") from e
+
+
+async def search(params: str, timeout: float | None = None) -> dict:
+    """Runs a query against the product index. `params` is an Algolia params string."""
+    return await _post(f"/1/indexes/{INDEX_NAME}/query", {"params": params}, timeout)
+
+
+async def recommend(requests_payload: list, timeout: float | None = None) -> dict:
+    """Calls the Algolia recommendations API with a list of recommendation requests."""
+    return await _post("/1/indexes/*/recommendations", {"requests": requests_payload}, timeout)
+
+
+async def multi_search(params_list: list, timeout: float | None = None) -> list:
+    """
+    Runs several queries against the product index in one request. Results come back in input order.
+    Raises AlgoliaError when the answer does not hold one result per query, e.g. an error body.
+    """
+    data = await _post(
+        "/1/indexes/*/queries",
+        {
+            "requests": [{"indexName": INDEX_NAME, "params": params} for params in params_list],
+            "strategy": "none"
+        },
+        timeout
+    )
+    results = data.get("results")
+    if not isinstance(results, list) or len(results) != len(params_list):
+        raise AlgoliaError(data.get("message") or f"Algolia returned {len(results or [])} results for {len(params_list)} queries")
+    return results
+
+
+async def batch(requests_payload: list, timeout: float | None = None) -> dict:
+    """
+    Sends indexing operations (updateObject, partialUpdateObject, deleteObject, ...) in one call.
+    Raises httpx.HTTPStatusError on a non-2xx answer so callers can retry.
+    """
+    import httpx
+    response = await get_client().post(
+        f"{ALGOLIA_WRITE_URL}/1/indexes/{INDEX_NAME}/batch",
+        json={"requests": requests_payload},
+        timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+    )
+    response.raise_for_status()
+    return response.json()
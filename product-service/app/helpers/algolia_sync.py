@@ -0,0 +1,306 @@
+import asyncio
+import heapq
+import os
+import time
+from typing import Optional
+import httpx
+from dotenv import load_dotenv
+from app.helpers import algolia_client, bson_json
+
+load_dotenv()
+# "watch" tails a change stream (needs a replica set, e.g. Atlas), "poll" follows an updated_at watermark
+ALGOLIA_SYNC_MODE = os.getenv("ALGOLIA_SYNC_MODE", "watch")
+ALGOLIA_SYNC_BATCH_SIZE = int(os.getenv("ALGOLIA_SYNC_BATCH_SIZE", "500"))
+# A lane sends a partial batch once it has waited this long for more changes
+ALGOLIA_SYNC_FLUSH_INTERVAL = float(os.getenv("ALGOLIA_SYNC_FLUSH_INTERVAL", "1"))
+# Parallel Algolia batch calls; each object always goes through the same lane, so its updates stay in order
+ALGOLIA_SYNC_CONCURRENCY = int(os.getenv("ALGOLIA_SYNC_CONCURRENCY", "4"))
+# Changes buffered per lane before the reader has to wait (back-pressure)
+ALGOLIA_SYNC_QUEUE_SIZE = int(os.getenv("ALGOLIA_SYNC_QUEUE_SIZE", "2000"))
+ALGOLIA_SYNC_POLL_INTERVAL = float(os.getenv("ALGOLIA_SYNC_POLL_INTERVAL", "5"))
+ALGOLIA_SYNC_MAX_RETRIES = int(os.getenv("ALGOLIA_SYNC_MAX_RETRIES", "5"))
+SYNC_STATE_COLLECTION = "algolia_sync_state"
+
+
+def to_record(document: dict) -> dict:
+    """Turns a product document into an Algolia record keyed by objectID."""
+    record = bson_json.to_jsonable(document)
+    record.pop("_id", None)
+    record["objectID"] = str(document["_id"])
+    return record
+
+
+class Change:
+    __slots__ = ("seq", "object_id", "operation", "position")
+
+    def __init__(self, seq: int, object_id: str, operation: Optional[dict], position: Optional[dict] = None):
+        self.seq = seq
+        self.object_id = object_id
+        self.operation = operation
+        # Resume token (watch) or watermark (poll) that is safe to store once this change is indexed
+        self.position = position
+
+
+class Checkpoint:
+    """
+    Tracks which changes are indexed. Lanes finish out of order, so the stored position only
+    advances past a change once every earlier change is indexed too.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._done = set()
+        self._positions = {}
+        self.committed = None
+
+    def add(self, change: Change):
+        heapq.heappush(self._pending, change.seq)
+        self._positions[change.seq] = change.position
+
+    def done(self, seqs) -> bool:
+        """Marks changes as indexed. Returns True when the committed position moved."""
+        self._done.update(seqs)
+        advanced = False
+        while self._pending and self._pending[0] in self._done:
+            seq = heapq.heappop(self._pending)
+            self._done.discard(seq)
+            position = self._positions.pop(seq)
+            if position is not None:
+                self.committed = position
+                advanced = True
+        return advanced
+
+
+class AlgoliaSync:
+    """Streams product changes from Mongo into the Algolia index in batches."""
+
+    def __init__(
+        self,
+        collection,
+        state_collection,
+        name: str = "products",
+        batch_size: int = ALGOLIA_SYNC_BATCH_SIZE,
+        flush_interval: float = ALGOLIA_SYNC_FLUSH_INTERVAL,
+        concurrency: int = ALGOLIA_SYNC_CONCURRENCY,
+        queue_size: int = ALGOLIA_SYNC_QUEUE_SIZE,
+        poll_interval: float = ALGOLIA_SYNC_POLL_INTERVAL,
+        max_retries: int = ALGOLIA_SYNC_MAX_RETRIES
+    ):
+        self.collection = collection
+        self.state_collection = state_collection
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+        self._lanes = [asyncio.Queue(maxsize=queue_size) for _ in range(concurrency)]
+        self._checkpoint = Checkpoint()
+        self._save_lock = asyncio.Lock()
+        self._seq = 0
+        self.indexed = 0
+        self.deleted = 0
+        self.batches = 0
+        self.retries = 0
+
+    async def load_state(self) -> dict:
+        return await self.state_collection.find_one({"_id": self.name}) or {}
+
+    async def reset_state(self):
+        await self.state_collection.delete_one({"_id": self.name})
+
+    async def _mark_done(self, seqs):
+        if not self._checkpoint.done(seqs):
+            return
+        # Lanes finish concurrently, the lock keeps an older position from overwriting a newer one
+        async with self._save_lock:
+            await self.state_collection.update_one(
+                {"_id": self.name},
+                {"$set": {**self._checkpoint.committed, "updated_at": time.time()}},
+                upsert=True
+            )
+
+    def _next_change(self, object_id: str, operation: Optional[dict], position: Optional[dict]) -> Change:
+        self._seq += 1
+        change = Change(self._seq, object_id, operation, position)
+        self._checkpoint.add(change)
+        return change
+
+    async def _enqueue(self, object_id: str, operation: dict, position: Optional[dict] = None):
+        change = self._next_change(object_id, operation, position)
+        # Blocks the reader while the lane is full
+        await self._lanes[hash(object_id) % len(self._lanes)].put(change)
+
+    def _operation_for_event(self, event: dict) -> Optional[dict]:
+        operation_type = event["operationType"]
+        if operation_type not in ("insert", "update", "replace", "delete"):
+            return None
+        object_id = str(event["documentKey"]["_id"])
+        if operation_type == "delete":
+            return {"action": "deleteObject", "body": {"objectID": object_id}}
+
+        description = event.get("updateDescription") or {}
+        updated = description.get("updatedFields") or {}
+        # Top-level field changes map directly onto an Algolia partial update
+        if (
+            operation_type == "update"
+            and updated
+            and not description.get("removedFields")
+            and not any("." in key for key in updated)
+        ):
+            body = bson_json.to_jsonable(updated)
+            body["objectID"] = object_id
+            return {"action": "partialUpdateObject", "body": body}
+
+        document = event.get("fullDocument")
+        if document is None:
+            # Deleted again before the lookup ran, a later delete event follows
+            return None
+        return {"action": "updateObject", "body": to_record(document)}
+
+    async def _read_change_stream(self, resume_token: Optional[dict]):
+        options = {"full_document": "updateLookup"}
+        if resume_token:
+            options["resume_after"] = resume_token
+        async with await self.collection.watch(**options) as stream:
+            async for event in stream:
+                operation = self._operation_for_event(event)
+                position = {"resume_token": event["_id"]}
+                if operation is None:
+                    # Nothing to index, but the token still moves forward once earlier changes are done
+                    await self._mark_done([self._next_change("", None, position).seq])
+                    continue
+                await self._enqueue(operation["body"]["objectID"], operation, position)
+
+    async def _poll(self, watermark: Optional[dict], once: bool):
+        """Follows (updated_at, _id) upwards. Deletes are not visible to this mode."""
+        last_updated = watermark.get("updated_at") if watermark else None
+        last_id = watermark.get("last_id") if watermark else None
+        while True:
+            if last_updated is None:
+                query = {"updated_at": {"$exists": True}}
+            else:
+                query = {"$or": [
+                    {"updated_at": {"$gt": last_updated}},
+                    {"updated_at": last_updated, "_id": {"$gt": last_id}}
+                ]}
+            cursor = self.collection.find(query).sort([("updated_at", 1), ("_id", 1)]).limit(self.batch_size)
+            found = 0
+            async for document in cursor:
+                found += 1
+                last_updated, last_id = document["updated_at"], document["_id"]
+                await self._enqueue(
+                    str(document["_id"]),
+                    {"action": "partialUpdateObject", "body": to_record(document)},
+                    {"watermark": {"updated_at": last_updated, "last_id": last_id}}
+                )
+            if found < self.batch_size:
+                if once:
+                    return
+                await asyncio.sleep(self.poll_interval)
+
+    async def _next_batch(self, lane: asyncio.Queue) -> tuple:
+        """Waits for one change, then gathers more until the batch is full or the flush interval passes."""
+        first = await lane.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                change = await asyncio.wait_for(lane.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if change is None:
+                return batch, True
+            batch.append(change)
+        return batch, False
+
+    async def _send(self, batch: list):
+        # One operation per object: full writes and deletes replace what came before, partial updates merge into it
+        latest = {}
+        for change in batch:
+            operation = change.operation
+            previous = latest.get(change.object_id)
+            if (
+                previous is not None
+                and operation["action"] == "partialUpdateObject"
+                and previous["action"] != "deleteObject"
+            ):
+                operation = {"action": previous["action"], "body": {**previous["body"], **operation["body"]}}
+            latest[change.object_id] = operation
+        operations = list(latest.values())
+
+        delay = 0.5
+        for attempt in range(self.max_retries + 1):
+            try:
+                await algolia_client.batch(operations)
+                break
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500 or e.response.status_code == 429
+                if not retryable or attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                print(f"Algolia batch failed, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+        self.batches += 1
+        for operation in operations:
+            if operation["action"] == "deleteObject":
+                self.deleted += 1
+            else:
+                self.indexed += 1
+        await self._mark_done([change.seq for change in batch])
+
+    async def _lane_worker(self, lane: asyncio.Queue):
+        while True:
+            batch, finished = await self._next_batch(lane)
+            if batch:
+                await self._send(batch)
+            if finished:
+                return
+
+    async def run(self, mode: str = ALGOLIA_SYNC_MODE, once: bool = False):
+        """
+        Runs until cancelled. With once=True the poll mode exits after catching up.
+        A lane that fails for good cancels the run, so the stored position never passes an unindexed change.
+        """
+        state = await self.load_state()
+        workers = [asyncio.create_task(self._lane_worker(lane)) for lane in self._lanes]
+        try:
+            if mode == "watch":
+                reader = self._read_change_stream(state.get("resume_token"))
+            elif mode == "poll":
+                reader = self._poll(state.get("watermark"), once)
+            else:
+                raise ValueError(f"Unknown sync mode: {mode}")
+
+            reader_task = asyncio.create_task(reader)
+            workers.append(reader_task)
+            pending = set(workers)
+            while not reader_task.done():
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+
+            # Reader caught up (poll once), let the lanes flush what is left
+            for lane in self._lanes:
+                await lane.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "indexed": self.indexed,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "retries": self.retries,
+            "queued": sum(lane.qsize() for lane in self._lanes),
+            "committed": self._checkpoint.committed
+        }
@@ -0,0 +1,258 @@
+import asyncio
+import heapq
+import os
+import pickle
+import time
+from array import array
+from bisect import bisect_left
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from app.database import db
+from app.helpers.local_search import tokenize, PRODUCTS_COLLECTION
+from app.helpers.recommendations import PRODUCT_VIEWS_KEY
+from app.helpers.redis_client import get_redis
+
+load_dotenv()
+# Written by scripts/build_autocomplete_index.py and loaded at startup, so cold starts skip the Mongo scan
+AUTOCOMPLETE_INDEX_PATH = os.getenv("AUTOCOMPLETE_INDEX_PATH", "/tmp/autocomplete_index.pkl")
+AUTOCOMPLETE_REBUILD_INTERVAL = float(os.getenv("AUTOCOMPLETE_REBUILD_INTERVAL", "900"))
+# Failed background builds are retried no sooner than this
+AUTOCOMPLETE_RETRY_INTERVAL = float(os.getenv("AUTOCOMPLETE_RETRY_INTERVAL", "60"))
+# Memory bound: only the most popular suggestions are kept past this many
+AUTOCOMPLETE_MAX_ENTRIES = int(os.getenv("AUTOCOMPLETE_MAX_ENTRIES", "200000"))
+# Prefixes matching more keys than this get their top suggestions precomputed, the rest scan their bisect range
+AUTOCOMPLETE_SCAN_LIMIT = int(os.getenv("AUTOCOMPLETE_SCAN_LIMIT", "256"))
+# Keys are cut to this many characters and made for at most this many word positions per suggestion
+AUTOCOMPLETE_KEY_LENGTH = int(os.getenv("AUTOCOMPLETE_KEY_LENGTH", "48"))
+AUTOCOMPLETE_MAX_WORD_KEYS = int(os.getenv("AUTOCOMPLETE_MAX_WORD_KEYS", "6"))
+# Largest limit a caller may ask for, also how many suggestions are precomputed per prefix
+AUTOCOMPLETE_MAX_SUGGESTIONS = int(os.getenv("AUTOCOMPLETE_MAX_SUGGESTIONS", "50"))
+# Categories have no view counter, they rank as if viewed this many times
+AUTOCOMPLETE_CATEGORY_WEIGHT = float(os.getenv("AUTOCOMPLETE_CATEGORY_WEIGHT", "100"))
+# How many of the most viewed products get a popularity score
+AUTOCOMPLETE_POPULAR_LIMIT = int(os.getenv("AUTOCOMPLETE_POPULAR_LIMIT", "50000"))
+CATEGORIES_COLLECTION = "amazonCategories"
+
+
+class AutocompleteIndex:
+    """
+    Sorted array of normalized keys, searched with bisect. Each suggestion is indexed under its full text
+    and from each of its first words on, so "sh" finds "Red shoes". Suggestions are numbered by rank,
+    so the best matches for a prefix are simply the smallest numbers in its key range.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self.texts = []
+        self.kinds = []
+        self.ids = []
+        self.keys = []
+        self.key_ranks = array("i")
+        # prefix -> ranks of its best suggestions, for prefixes that would scan large ranges
+        self.top = {}
+        self.top_size = 0
+        self.built_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def build(self, candidates: list, max_entries: int = AUTOCOMPLETE_MAX_ENTRIES,
+              scan_limit: int = AUTOCOMPLETE_SCAN_LIMIT, top_size: int = AUTOCOMPLETE_MAX_SUGGESTIONS):
+        """`candidates` holds (text, kind, id, score) tuples. Duplicate texts keep the highest score."""
+        best = {}
+        for text, kind, object_id, score in candidates:
+            normalized = " ".join(tokenize(text))
+            if not normalized:
+                continue
+            current = best.get(normalized)
+            if current is None or score > current[3]:
+                best[normalized] = (text.strip(), kind, object_id, score)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][3], len(item[0]), item[0]))[:max_entries]
+
+        pairs = []
+        for rank, (normalized, (text, kind, object_id, _)) in enumerate(ranked):
+            self.texts.append(text)
+            self.kinds.append(kind)
+            self.ids.append(object_id)
+            words = normalized.split(" ")
+            for position in range(min(len(words), AUTOCOMPLETE_MAX_WORD_KEYS)):
+                pairs.append((" ".join(words[position:])[:AUTOCOMPLETE_KEY_LENGTH], rank))
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_ranks = array("i", (rank for _, rank in pairs))
+
+        # Walk down one character at a time, only inside ranges that are still too large to scan
+        self.top = {}
+        self.top_size = top_size
+        large = [(0, len(self.keys))]
+        length = 0
+        while large:
+            length += 1
+            next_large = []
+            for start, end in large:
+                position = start
+                while position < end:
+                    if len(self.keys[position]) < length:
+                        position += 1
+                        continue
+                    prefix = self.keys[position][:length]
+                    group_end = bisect_left(self.keys, prefix + "\uffff", position, end)
+                    if group_end - position > scan_limit:
+                        self.top[prefix] = array("i", heapq.nsmallest(top_size, set(self.key_ranks[position:group_end])))
+                        next_large.append((position, group_end))
+                    position = group_end
+            large = next_large
+        self.built_at = time.time()
+
+    def suggest(self, query: str, limit: int = 10) -> list:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        prefix = " ".join(tokens)
+        # "red " means the word "red" is complete
+        if query[-1:].isspace():
+            prefix += " "
+        prefix = prefix[:AUTOCOMPLETE_KEY_LENGTH]
+
+        ranks = self.top.get(prefix)
+        if ranks is None or limit > self.top_size:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\uffff", start)
+            ranks = heapq.nsmallest(limit, set(self.key_ranks[start:end]))
+        return [
+            {"text": self.texts[rank], "type": self.kinds[rank], "id": self.ids[rank]}
+            for rank in ranks[:limit]
+        ]
+
+    def stats(self) -> dict:
+        return {
+            "suggestions": len(self.texts),
+            "keys": len(self.keys),
+            "precomputed_prefixes": len(self.top),
+            "built_at": self.built_at
+        }
+
+    def save(self, path: str):
+        """Writes the index to disk so a cold process can answer without a full Mongo scan."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((self.FORMAT_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Loads an index written by save(). Returns None if the file is missing or outdated."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            version, index = pickle.load(f)
+        if version != cls.FORMAT_VERSION:
+            return None
+        return index
+
+
+def load_candidates(views: dict) -> list:
+    """Reads product and category names from Mongo, scored by product views."""
+    candidates = []
+    for product in db[PRODUCTS_COLLECTION].find({}, {"name": 1}):
+        name = product.get("name")
+        if isinstance(name, str):
+            product_id = str(product["_id"])
+            candidates.append((name, "product", product_id, views.get(product_id, 0.0)))
+    for category in db[CATEGORIES_COLLECTION].find({}, {"category": 1}):
+        name = category.get("category")
+        if isinstance(name, str):
+            candidates.append((name, "category", str(category["_id"]), AUTOCOMPLETE_CATEGORY_WEIGHT))
+    return candidates
+
+
+async def load_views() -> dict:
+    redis_client = get_redis()
+    if redis_client is None:
+        return {}
+    try:
+        top = await redis_client.zrevrange(PRODUCT_VIEWS_KEY, 0, AUTOCOMPLETE_POPULAR_LIMIT - 1, withscores=True)
+    except Exception as e:
+        print(f"Autocomplete could not read product views: {e}")
+        return {}
+    return {(member.decode() if isinstance(member, bytes) else member): score for member, score in top}
+
+
+_index: AutocompleteIndex | None = None
+_load_attempted = False
+_rebuild_task = None
+_rebuild_started = None
+
+
+def build_index(views: dict) -> AutocompleteIndex:
+    index = AutocompleteIndex()
+    index.build(load_candidates(views))
+    return index
+
+
+def load_saved(path: str = AUTOCOMPLETE_INDEX_PATH) -> AutocompleteIndex | None:
+    """Installs the prebuilt index from disk, if there is one. Called once at startup."""
+    global _index, _load_attempted
+    _load_attempted = True
+    try:
+        index = AutocompleteIndex.load(path)
+    except Exception as e:
+        print(f"Could not load autocomplete index from {path}: {e}")
+        return None
+    if index is not None:
+        _index = index
+    return index
+
+
+def _build_and_save(views: dict) -> AutocompleteIndex:
+    index = build_index(views)
+    try:
+        index.save(AUTOCOMPLETE_INDEX_PATH)
+    except OSError as e:
+        print(f"Could not save autocomplete index to {AUTOCOMPLETE_INDEX_PATH}: {e}")
+    return index
+
+
+async def rebuild() -> AutocompleteIndex:
+    global _index
+    views = await load_views()
+    # Swapped in whole, requests keep using the old index until the new one is complete
+    _index = await run_in_threadpool(_build_and_save, views)
+    return _index
+
+
+async def _background_rebuild():
+    global _rebuild_task
+    try:
+        await rebuild()
+    except Exception as e:
+        print(f"Autocomplete index rebuild failed: {e}")
+    finally:
+        _rebuild_task = None
+_rebuild_started = None
+
+
+def get_index() -> AutocompleteIndex | None:
+    """
+    Returns the process-wide index, or None while there is none yet. Missing or stale indexes are
+    (re)built in the background, requests never wait for the Mongo scan.
+    """
+    global _rebuild_task, _rebuild_started
+    if _index is None and not _load_attempted:
+        load_saved()
+    needs_build = _index is None or time.time() - _index.built_at >= AUTOCOMPLETE_REBUILD_INTERVAL
+    may_retry = _rebuild_started is None or time.monotonic() - _rebuild_started >= AUTOCOMPLETE_RETRY_INTERVAL
+    if _rebuild_task is None and needs_build and may_retry:
+        _rebuild_started = time.monotonic()
+        _rebuild_task = asyncio.create_task(_background_rebuild())
+    return _index
+
+
+async def suggest(query: str, limit: int) -> list:
+    """Suggestions for the query, empty until the index is ready."""
+    index = get_index()
+    if index is None:
+        return []
+    return index.suggest(query, limit)
@@ -0,0 +1,17 @@
+import asyncio
+from typing import Coroutine
+
+# The event loop only keeps weak references to tasks, so fire-and-forget work is held here until it finishes
+_tasks: set = set()
+
+
+def run_in_background(coro: Coroutine) -> asyncio.Task:
+    """Starts `coro` as a task nobody awaits, kept referenced until it is done."""
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def pending() -> int:
+    return len(_tasks)
@@ -0,0 +1,28 @@
+import orjson
+from bson import json_util
+from fastapi.responses import Response
+
+# datetimes are routed through json_util.default so they keep the {"$date": ...} form
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def dumps(obj) -> bytes:
+    """
+    Serializes Mongo documents to JSON bytes in a single pass.
+    Output matches json_util.dumps: ObjectId, datetime, Decimal128 etc. use relaxed extended JSON.
+    """
+    return orjson.dumps(obj, default=json_util.default, option=ORJSON_OPTIONS)
+
+
+def to_jsonable(obj):
+    """Converts a Mongo document into plain JSON-compatible Python objects."""
+    return orjson.loads(dumps(obj))
+
+
+class MongoJSONResponse(Response):
+    """JSON response that accepts raw Mongo documents and encodes them straight to bytes."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
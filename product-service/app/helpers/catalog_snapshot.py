@@ -0,0 +1,373 @@
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from bson import ObjectId, Decimal128
+from dotenv import load_dotenv
+from app.database import db, demo_db
+
+load_dotenv()
+# Shared storage written by scripts/export_catalog_snapshot.py and read by every instance, e.g. an EFS
+# access point mounted on both the export job and the functions. A Lambda's /tmp is private to it.
+CATALOG_SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", "/mnt/catalog_snapshots")
+# Snapshots older than this are not served, the export job should rewrite them well within it
+CATALOG_SNAPSHOT_MAX_AGE = float(os.getenv("CATALOG_SNAPSHOT_MAX_AGE", "3600"))
+CATALOG_SNAPSHOT_BATCH_SIZE = int(os.getenv("CATALOG_SNAPSHOT_BATCH_SIZE", "2000"))
+
+MAGIC = b"PCATCOL2"
+ALIGNMENT = 8
+
+# Column kinds:
+#   f8    float64, NaN when missing
+#   i8    int64, used for timestamps in epoch milliseconds, INT64_MIN when missing
+#   oid   12 raw ObjectId bytes per row, plus a validity bitmap
+#   str   uint64 offsets (rows + 1) into a UTF-8 blob, plus a validity bitmap
+#   dict  int32 codes into a string table, -1 when missing; for low-cardinality fields
+# Validity bitmaps hold one bit per row, least significant bit first, set when the value is present
+MISSING_INT = -(2 ** 63)
+
+# name -> (database, collection, [(field, kind), ...])
+SNAPSHOTS = {
+    "products": (db, "products", [
+        ("_id", "oid"),
+        ("name", "str"),
+        ("price", "f8"),
+        ("sp", "f8"),
+        ("mrp", "f8"),
+        ("gst", "f8"),
+        ("category_id", "dict"),
+        ("updated_at", "i8"),
+    ]),
+    "amazon_products": (demo_db, "products_trial_categories", [
+        ("_id", "oid"),
+        ("name", "str"),
+        ("amazon_asin", "str"),
+        ("amazon_cat", "dict"),
+        ("amazon_product_price", "f8"),
+        ("is_amazon_product", "dict"),
+        ("parent_product", "str"),
+        ("amazon_product_url", "str"),
+    ]),
+}
+
+
+def _to_float(value) -> float:
+    if isinstance(value, Decimal128):
+        value = value.to_decimal()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_millis(value) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return MISSING_INT
+
+
+class _ColumnBuilder:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.rows = 0
+        if kind == "f8":
+            self.values = array("d")
+        elif kind == "i8":
+            self.values = array("q")
+        elif kind == "oid":
+            self.values = bytearray()
+            self.validity = bytearray()
+        elif kind == "str":
+            self.offsets = array("Q", [0])
+            self.blob = bytearray()
+            self.validity = bytearray()
+        elif kind == "dict":
+            self.values = array("i")
+            self.table = {}
+        else:
+            raise ValueError(f"Unknown column kind: {kind}")
+
+    def _mark(self, present: bool):
+        if self.rows % 8 == 0:
+            self.validity.append(0)
+        if present:
+            self.validity[-1] |= 1 << (self.rows % 8)
+
+    def append(self, value):
+        if self.kind in ("oid", "str"):
+            self._mark(value is not None and (self.kind == "str" or isinstance(value, ObjectId)))
+        self.rows += 1
+        if self.kind == "f8":
+            self.values.append(_to_float(value))
+        elif self.kind == "i8":
+            self.values.append(_to_millis(value))
+        elif self.kind == "oid":
+            self.values += value.binary if isinstance(value, ObjectId) else bytes(12)
+        elif self.kind == "str":
+            if value is not None:
+                self.blob += str(value).encode("utf-8")
+            self.offsets.append(len(self.blob))
+        else:
+            if value is None:
+                self.values.append(-1)
+            else:
+                self.values.append(self.table.setdefault(str(value), len(self.table)))
+
+    def buffers(self) -> list:
+        """Returns the column's buffers in file order."""
+        if self.kind == "str":
+            return [self.offsets.tobytes(), bytes(self.blob), bytes(self.validity)]
+        if self.kind == "dict":
+            return [self.values.tobytes(), json.dumps(list(self.table), ensure_ascii=False).encode("utf-8")]
+        if self.kind == "oid":
+            return [bytes(self.values), bytes(self.validity)]
+        return [self.values.tobytes()]
+
+
+def _pad(length: int) -> int:
+    return (-length) % ALIGNMENT
+
+
+def snapshot_path(name: str, directory: str = CATALOG_SNAPSHOT_DIR) -> str:
+    return os.path.join(directory, f"{name}.pcat")
+
+
+def export_snapshot(name: str, directory: str = CATALOG_SNAPSHOT_DIR, batch_size: int = CATALOG_SNAPSHOT_BATCH_SIZE) -> dict:
+    """
+    Streams one collection into a columnar snapshot file, written atomically next to the old one.
+    Returns the header that was written.
+    """
+    database, collection_name, schema = SNAPSHOTS[name]
+    projection = {field: 1 for field, _ in schema}
+    builders = [(field, _ColumnBuilder(kind)) for field, kind in schema]
+
+    rows = 0
+    cursor = database[collection_name].find({}, projection, batch_size=batch_size).sort("_id", 1)
+    for document in cursor:
+        for field, builder in builders:
+            builder.append(document.get(field))
+        rows += 1
+
+    # Buffer offsets are relative to the aligned data section that follows the header
+    columns = []
+    buffers = []
+    offset = 0
+    for field, builder in builders:
+        column_buffers = builder.buffers()
+        column = {"name": field, "kind": builder.kind, "buffers": []}
+        for buffer in column_buffers:
+            column["buffers"].append([offset, len(buffer)])
+            offset += len(buffer) + _pad(len(buffer))
+        columns.append(column)
+        buffers.extend(column_buffers)
+
+    header = {
+        "snapshot": name,
+        "collection": collection_name,
+        "rows": rows,
+        "created_at": time.time(),
+        "byteorder": sys.byteorder,
+        "columns": columns,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * _pad(len(MAGIC) + 8 + len(header_bytes))
+
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(name, directory)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for buffer in buffers:
+            f.write(buffer)
+            f.write(b"\0" * _pad(len(buffer)))
+    os.replace(tmp_path, path)
+    return header
+
+
+def _is_valid(validity: memoryview, row: int) -> bool:
+    return bool(validity[row >> 3] & (1 << (row & 7)))
+
+
+class StringColumn:
+    """Variable-length strings decoded on access straight from the mapped file. Missing values read as None."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview, validity: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+        self.validity = validity
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int):
+        if not _is_valid(self.validity, row):
+            return None
+        return bytes(self.blob[self.offsets[row]:self.offsets[row + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+class DictColumn:
+    """Categorical strings: int32 codes plus the string table. -1 marks a missing value."""
+
+    def __init__(self, codes: memoryview, table: list):
+        self.codes = codes
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, row: int):
+        code = self.codes[row]
+        return self.table[code] if code >= 0 else None
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+class ObjectIdColumn:
+    def __init__(self, raw: memoryview, validity: memoryview):
+        self.raw = raw
+        self.validity = validity
+
+    def __len__(self) -> int:
+        return len(self.raw) // 12
+
+    def __getitem__(self, row: int):
+        if not _is_valid(self.validity, row):
+            return None
+        return bytes(self.raw[row * 12:(row + 1) * 12]).hex()
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
+
+
+class SnapshotReader:
+    """
+    Memory-maps a snapshot file. Numeric columns come back as typed memoryviews over the mapping,
+    so nothing is copied until a value is read; with NumPy installed, numpy() gives zero-copy arrays.
+    Columns stop working once the reader is closed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_length,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(bytes(self._map[header_start:header_start + header_length]))
+        if self.header.get("byteorder", sys.byteorder) != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path} was written on a {self.header['byteorder']}-endian machine")
+        self._data_start = header_start + header_length
+        self._view = memoryview(self._map)
+        # Every view handed out, released on close so the mapping can be unmapped while callers still hold columns
+        self._views = []
+        self.columns = {column["name"]: column for column in self.header["columns"]}
+
+    @property
+    def rows(self) -> int:
+        return self.header["rows"]
+
+    def _buffer(self, column: dict, index: int) -> memoryview:
+        offset, length = column["buffers"][index]
+        start = self._data_start + offset
+        return self._track(self._view[start:start + length])
+
+    def _track(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def column(self, name: str):
+        column = self.columns[name]
+        kind = column["kind"]
+        if kind == "f8":
+            return self._track(self._buffer(column, 0).cast("d"))
+        if kind == "i8":
+            return self._track(self._buffer(column, 0).cast("q"))
+        if kind == "oid":
+            return ObjectIdColumn(self._buffer(column, 0), self._buffer(column, 1))
+        if kind == "str":
+            return StringColumn(self._track(self._buffer(column, 0).cast("Q")), self._buffer(column, 1), self._buffer(column, 2))
+        return DictColumn(self._track(self._buffer(column, 0).cast("i")), json.loads(bytes(self._buffer(column, 1))))
+
+    def numpy(self, name: str):
+        """
+        Zero-copy NumPy view of a numeric or dict-code column. Needs numpy, which the service does not ship.
+        The array pins the mapping: while one is alive, close() leaves unmapping to garbage collection.
+        """
+        import numpy as np
+
+        column = self.columns[name]
+        dtype = {"f8": np.float64, "i8": np.int64, "dict": np.int32}[column["kind"]]
+        offset, length = column["buffers"][0]
+        return np.frombuffer(self._map, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=self._data_start + offset)
+
+    def close(self):
+        # Derived views first, a view cannot be released while casts or slices of it exist
+        for view in reversed(getattr(self, "_views", [])):
+            view.release()
+        if hasattr(self, "_view"):
+            self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # NumPy arrays from numpy() still export the mapping, it is unmapped when they are collected
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_export_locks = {name: threading.Lock() for name in SNAPSHOTS}
+
+
+def snapshot_age(name: str, directory: str = CATALOG_SNAPSHOT_DIR):
+    """Seconds since the snapshot was written, or None if it has not been exported yet."""
+    try:
+        return time.time() - os.path.getmtime(snapshot_path(name, directory))
+    except FileNotFoundError:
+        return None
+
+
+def ensure_snapshot(name: str, max_age: float = CATALOG_SNAPSHOT_MAX_AGE, directory: str = CATALOG_SNAPSHOT_DIR) -> str:
+    """
+    Returns the path of a snapshot no older than `max_age`, exporting a fresh one if needed. For the
+    export job only: a full export takes far longer than a request may.
+    """
+    path = snapshot_path(name, directory)
+
+    def is_fresh() -> bool:
+        age = snapshot_age(name, directory)
+        return age is not None and age < max_age
+
+    if is_fresh():
+        return path
+    # One export per snapshot at a time, concurrent callers wait for it and reuse the file
+    with _export_locks[name]:
+        if not is_fresh():
+            export_snapshot(name, directory)
+    return path
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from app.database import db, async_db
+from app.helpers import bson_json
+
+load_dotenv()
+# How often the collection is checked for changes before the snapshot is reused
+CATEGORY_SNAPSHOT_CHECK_INTERVAL = float(os.getenv("CATEGORY_SNAPSHOT_CHECK_INTERVAL", "30"))
+# Hard upper bound on snapshot age, catches in-place edits the version check cannot see
+CATEGORY_SNAPSHOT_MAX_AGE = float(os.getenv("CATEGORY_SNAPSHOT_MAX_AGE", "3600"))
+# Opt-in change stream listener (needs a replica set, e.g. Atlas)
+CATEGORY_SNAPSHOT_WATCH = os.getenv("CATEGORY_SNAPSHOT_WATCH", "false").lower() in ("1", "true", "yes")
+CATEGORIES_COLLECTION = "amazonCategories"
+
+
+class CategorySnapshot:
+    """
+    Pre-serialized copy of the amazonCategories collection held in process memory.
+    The response body and its ETag are built once per change, not once per request.
+    """
+
+    def __init__(self, check_interval: float, max_age: float):
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self._lock = asyncio.Lock()
+        # (body, etag, categories_by_id) swapped as one tuple so readers never see a half-built snapshot
+        self._state = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._dirty = False
+        self._watcher = None
+
+    async def _current_version(self, collection):
+        latest = await collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        return await collection.estimated_document_count(), latest["_id"] if latest else None
+
+    async def _rebuild(self, collection, version):
+        payload = bson_json.to_jsonable(await collection.find().to_list())
+        body = bson_json.dumps({
+            "message": "Successfully retrieved all categories",
+            "payload": payload
+        })
+        etag = '"' + hashlib.sha256(body).hexdigest() + '"'
+        categories_by_id = {doc["_id"]["$oid"]: doc for doc in payload if "_id" in doc}
+        self._state = (body, etag, categories_by_id)
+        self._version = version
+        self._loaded_at = time.monotonic()
+
+    def _is_current(self, now: float) -> bool:
+        return (
+            self._state is not None
+            and not self._dirty
+            and now - self._checked_at < self.check_interval
+            and now - self._loaded_at < self.max_age
+        )
+
+    async def get(self) -> tuple:
+        """Returns (body, etag, categories_by_id), refreshing the snapshot if it is out of date."""
+        if self._is_current(time.monotonic()):
+            return self._state
+        async with self._lock:
+            now = time.monotonic()
+            if self._is_current(now):
+                return self._state
+            collection = async_db[CATEGORIES_COLLECTION]
+            version = await self._current_version(collection)
+            if (
+                self._state is None
+                or self._dirty
+                or version != self._version
+                or now - self._loaded_at >= self.max_age
+            ):
+                self._dirty = False
+                await self._rebuild(collection, version)
+            self._checked_at = now
+        return self._state
+
+    async def lookup(self, object_ids: list) -> dict:
+        """
+        Returns {str(id): category} for the given ObjectIds from the snapshot.
+        Ids the snapshot does not know yet are fetched together with one $in query.
+        """
+        _, _, categories_by_id = await self.get()
+        found = {}
+        missing = []
+        for object_id in object_ids:
+            doc = categories_by_id.get(str(object_id))
+            if doc is not None:
+                found[str(object_id)] = doc
+            else:
+                missing.append(object_id)
+
+        if missing:
+            async for doc in async_db[CATEGORIES_COLLECTION].find({"_id": {"$in": missing}}):
+                found[str(doc["_id"])] = bson_json.to_jsonable(doc)
+                # Created after the last version check, pick it up on the next read
+                self.mark_dirty()
+        return found
+
+    def mark_dirty(self):
+        """Forces a rebuild on the next read."""
+        self._dirty = True
+
+    def _watch_loop(self):
+        # Runs in its own thread, so it stays on the sync client
+        while True:
+            try:
+                with db[CATEGORIES_COLLECTION].watch() as stream:
+                    for _ in stream:
+                        self.mark_dirty()
+            except Exception as e:
+                print(f"Category change stream stopped, retrying: {e}")
+                self.mark_dirty()
+                time.sleep(5)
+
+    def start_watcher(self):
+        """Starts the change stream listener in a daemon thread (once per process)."""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch_loop, daemon=True)
+            self._watcher.start()
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+category_snapshot = CategorySnapshot(
+    check_interval=CATEGORY_SNAPSHOT_CHECK_INTERVAL,
+    max_age=CATEGORY_SNAPSHOT_MAX_AGE
+)
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from app.database import demo_db, async_demo_db
+
+load_dotenv()
+# How long the endpoint reuses the summary it read from Mongo
+AMAZON_CATEGORY_SUMMARY_TTL = float(os.getenv("AMAZON_CATEGORY_SUMMARY_TTL", "300"))
+# Incremental refreshes turn into a full one after this long. Deletions and the category a product
+# moved away from are only corrected by full runs, so this bounds how stale those counts can get.
+AMAZON_CATEGORY_SUMMARY_FULL_INTERVAL = float(os.getenv("AMAZON_CATEGORY_SUMMARY_FULL_INTERVAL", "86400"))
+PRODUCTS_COLLECTION = "products_trial_categories"
+SUMMARY_COLLECTION = "amazon_category_summary"
+STATE_COLLECTION = "amazon_category_summary_state"
+# The same predicate as the fulfillmen lookups ({"is_amazon_product": {"$ne": "1"}}): only the string "1"
+# marks an Amazon listing, everything else is a fulfillmen product
+AMAZON_FLAG = "1"
+
+
+def summary_pipeline(match: dict, refreshed_at: datetime) -> list:
+    """Recounts the matched categories and upserts one summary document per amazon_cat."""
+    price = {"$convert": {"input": "$amazon_product_price", "to": "double", "onError": None, "onNull": None}}
+    return [
+        # $and, so a match on amazon_cat cannot replace the guard against products without one
+        {"$match": {"$and": [{"amazon_cat": {"$exists": True, "$ne": None}}, match]}},
+        {"$group": {
+            "_id": "$amazon_cat",
+            "product_count": {"$sum": 1},
+            "amazon_count": {"$sum": {"$cond": [{"$eq": ["$is_amazon_product", AMAZON_FLAG]}, 1, 0]}},
+            "min_price": {"$min": price},
+            "max_price": {"$max": price},
+        }},
+        {"$addFields": {
+            "fulfillmen_count": {"$subtract": ["$product_count", "$amazon_count"]},
+            "refreshed_at": refreshed_at,
+        }},
+        {"$merge": {"into": SUMMARY_COLLECTION, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+
+def refresh_summary(full: bool = False) -> dict:
+    """
+    Brings the summary collection up to date. The incremental run recounts the categories of products
+    inserted (by _id) or updated (by updated_at) since the last run, which covers new products, price
+    edits and the category a product moved to. Deletions and the category a product moved away from
+    are only picked up by a full run, which also removes categories that no longer have products.
+    A full run happens at least every AMAZON_CATEGORY_SUMMARY_FULL_INTERVAL.
+    """
+    products = demo_db[PRODUCTS_COLLECTION]
+    summary = demo_db[SUMMARY_COLLECTION]
+    state_collection = demo_db[STATE_COLLECTION]
+    state = state_collection.find_one({"_id": SUMMARY_COLLECTION}) or {}
+    last_id = state.get("last_id")
+    last_updated = state.get("last_updated")
+    full_refreshed_at = state.get("full_refreshed_at")
+    started = datetime.now(timezone.utc)
+
+    # Read the upper bounds first, so products written during the run are counted next time
+    newest = products.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+    if newest is None:
+        return {"mode": "full" if full else "incremental", "categories": 0}
+    newest_id = newest["_id"]
+    newest_updated = products.find_one({"updated_at": {"$exists": True}}, {"updated_at": 1}, sort=[("updated_at", -1)])
+    newest_updated = newest_updated["updated_at"] if newest_updated else last_updated
+
+    if full_refreshed_at is not None and full_refreshed_at.tzinfo is None:
+        # Mongo hands datetimes back naive, in UTC
+        full_refreshed_at = full_refreshed_at.replace(tzinfo=timezone.utc)
+    full = full or last_id is None or full_refreshed_at is None or \
+        (started - full_refreshed_at).total_seconds() >= AMAZON_CATEGORY_SUMMARY_FULL_INTERVAL
+
+    if full:
+        mode = "full"
+        products.aggregate(summary_pipeline({}, started))
+        removed = summary.delete_many({"refreshed_at": {"$lt": started}}).deleted_count
+        categories = summary.count_documents({})
+        full_refreshed_at = started
+    else:
+        mode = "incremental"
+        removed = 0
+        changes = [{"_id": {"$gt": last_id, "$lte": newest_id}}]
+        if last_updated is not None and newest_updated is not None:
+            changes.append({"updated_at": {"$gt": last_updated, "$lte": newest_updated}})
+        elif newest_updated is not None:
+            changes.append({"updated_at": {"$lte": newest_updated}})
+        # Products without a category have nothing to recount
+        changed = [category for category in products.distinct("amazon_cat", {"$or": changes}) if category is not None]
+        categories = len(changed)
+        if changed:
+            products.aggregate(summary_pipeline({"amazon_cat": {"$in": changed}}, started))
+
+    state_collection.update_one(
+        {"_id": SUMMARY_COLLECTION},
+        {"$set": {
+            "last_id": newest_id,
+            "last_updated": newest_updated,
+            "full_refreshed_at": full_refreshed_at,
+            "refreshed_at": started,
+            "mode": mode
+        }},
+        upsert=True
+    )
+    return {"mode": mode, "categories": categories, "removed": removed}
+
+
+class SummaryCache:
+    """Keeps the summary documents in process for a short TTL, one Mongo read per expiry."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> list:
+        if self._entries is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._entries
+        async with self._lock:
+            if self._entries is None or time.monotonic() - self._loaded_at >= self.ttl:
+                entries = await async_demo_db[SUMMARY_COLLECTION].find().sort("_id", 1).to_list()
+                self._entries = entries
+                self._loaded_at = time.monotonic()
+        return self._entries
+
+    def invalidate(self):
+        self._entries = None
+
+
+category_summary = SummaryCache(AMAZON_CATEGORY_SUMMARY_TTL)
@@ -0,0 +1,98 @@
+import csv
+import io
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv()
+CSV_EXPORT_BATCH_SIZE = int(os.getenv("CSV_EXPORT_BATCH_SIZE", "500"))
+# Mangum buffers the whole response body on Lambda, so even a streamed export has to fit in memory
+# there. Bulk exports with more rows are refused, 0 disables the cap.
+CSV_EXPORT_MAX_ROWS = int(os.getenv("CSV_EXPORT_MAX_ROWS", "50000"))
+
+# Defining CSV header with fields
+FULFILLMEN_CSV_HEADER = [
+    "ASIN",
+    "Title",
+    "Amazon Product Price",
+    "Amazon Product URL",
+    "Amazon Product Image URL",
+    "SKU",
+    "Parent Product",
+    "is_amazon_product",
+]
+
+# Only the exported columns are sent back by Mongo
+FULFILLMEN_CSV_PROJECTION = {
+    "_id": 0,
+    "amazon_asin": 1,
+    "name": 1,
+    "amazon_product_price": 1,
+    "amazon_product_url": 1,
+    "amazon_product_image_url": 1,
+    "skus": 1,
+    "parent_product": 1,
+    "is_amazon_product": 1,
+}
+
+
+def fulfillmen_csv_row(product: dict) -> list:
+    skus = product.get("skus", "")
+    if isinstance(skus, list):
+        skus = ",".join([str(sku) for sku in skus])
+    return [
+        product.get("amazon_asin", ""),
+        product.get("name", ""),
+        product.get("amazon_product_price", ""),
+        product.get("amazon_product_url", ""),
+        product.get("amazon_product_image_url", ""),
+        skus,
+        product.get("parent_product", ""),
+        product.get("is_amazon_product", ""),
+    ]
+
+
+def export_filename(label: str) -> str:
+    """Attachment name for an export, with anything but letters, digits, dots and dashes replaced."""
+    return f"fulfillmen_matches_{re.sub(r'[^A-Za-z0-9.-]+', '_', label).strip('_')}.csv"
+
+
+async def exceeds_export_cap(collection, query: dict, max_rows: int = CSV_EXPORT_MAX_ROWS) -> bool:
+    """Whether the export would have more than `max_rows` rows. Counts no further than the cap."""
+    if max_rows <= 0:
+        return False
+    return await collection.count_documents(query, limit=max_rows + 1) > max_rows
+
+
+async def find_for_export(collection, query: dict):
+    """
+    Opens a projected async cursor for the export and reads the first document.
+    Returns (first_document, cursor), first_document is None when nothing matches.
+    """
+    cursor = collection.find(query, FULFILLMEN_CSV_PROJECTION, batch_size=CSV_EXPORT_BATCH_SIZE)
+    first_document = await anext(cursor, None)
+    if first_document is None:
+        await cursor.close()
+    return first_document, cursor
+
+
+async def stream_csv(first_document: dict, cursor, batch_size: int = CSV_EXPORT_BATCH_SIZE):
+    """Yields the CSV header and then the rows in chunks of `batch_size`, straight from the cursor."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(FULFILLMEN_CSV_HEADER)
+    writer.writerow(fulfillmen_csv_row(first_document))
+
+    try:
+        pending = 1
+        async for product in cursor:
+            writer.writerow(fulfillmen_csv_row(product))
+            pending += 1
+            if pending >= batch_size:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+                pending = 0
+        yield output.getvalue()
+    finally:
+        await cursor.close()
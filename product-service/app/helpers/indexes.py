@@ -0,0 +1,47 @@
+from pymongo import ASCENDING, IndexModel
+from app.database import db, demo_db
+
+DATABASES = {
+    "main": db,
+    "demo": demo_db,
+}
+
+# Indexes every collection queried by the product service needs, grouped by (database, collection).
+# _id lookups are served by the default _id index and are not listed.
+INDEX_MANIFEST = {
+    ("main", "products"): [
+        # Algolia sync poll mode and the local search refresh follow this watermark
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_1__id_1"),
+    ],
+    ("demo", "products_trial_categories"): [
+        # products-by-category pages (skip and keyset), per-category counts, category exports
+        IndexModel([("amazon_cat", ASCENDING), ("_id", ASCENDING)], name="amazon_cat_1__id_1"),
+        # fulfillmen matches, product details and CSV exports by ASIN
+        IndexModel([("amazon_asin", ASCENDING)], name="amazon_asin_1"),
+        # fulfillmen matches of a parent product
+        IndexModel([("parent_product", ASCENDING), ("is_amazon_product", ASCENDING)], name="parent_product_1_is_amazon_product_1"),
+        # incremental category summary refreshes follow this watermark
+        IndexModel([("updated_at", ASCENDING)], name="updated_at_1"),
+    ],
+}
+
+
+def _key_spec(keys) -> tuple:
+    return tuple((field, direction) for field, direction in keys.items()) if isinstance(keys, dict) else tuple(keys)
+
+
+def ensure_indexes(dry_run: bool = False) -> list:
+    """
+    Creates any manifest index that does not exist yet. Indexes are matched by key pattern,
+    so running this repeatedly is a no-op. Returns the (database, collection, name) of each missing index.
+    """
+    missing = []
+    for (database, collection_name), indexes in INDEX_MANIFEST.items():
+        collection = DATABASES[database][collection_name]
+        existing = {_key_spec(info["key"]) for info in collection.index_information().values()}
+        to_create = [index for index in indexes if _key_spec(index.document["key"]) not in existing]
+        for index in to_create:
+            missing.append((database, collection_name, index.document["name"]))
+        if to_create and not dry_run:
+            collection.create_indexes(to_create)
+    return missing
@@ -0,0 +1,36 @@
+import os
+from urllib.parse import urlencode
+from dotenv import load_dotenv
+
+load_dotenv()
+# Fields kept in lean responses, for Algolia hits and Mongo documents alike
+LEAN_FIELDS = [field.strip() for field in os.getenv(
+    "LEAN_FIELDS", "name,price,sp,mrp,images,variable_pricing,category_id"
+).split(",") if field.strip()]
+# Lean mode for clients that do not pass ?lean= explicitly
+LEAN_RESPONSES_DEFAULT = os.getenv("LEAN_RESPONSES_DEFAULT", "false").lower() in ("1", "true", "yes")
+# Identifiers survive the projection so clients can still link to the product
+ID_FIELDS = ("_id", "objectID")
+
+
+def search_params() -> str:
+    """Algolia params that return only the lean fields and skip highlight and snippet metadata."""
+    return urlencode({
+        "attributesToRetrieve": ",".join(LEAN_FIELDS),
+        "attributesToHighlight": "[]",
+        "attributesToSnippet": "[]"
+    })
+
+
+def recommend_query_parameters() -> dict:
+    """Same projection for the Recommend API, which takes search parameters as an object."""
+    return {
+        "attributesToRetrieve": LEAN_FIELDS,
+        "attributesToHighlight": [],
+        "attributesToSnippet": []
+    }
+
+
+def project(document: dict) -> dict:
+    """Returns a new dict with the whitelisted fields, leaving cached documents untouched."""
+    return {key: value for key, value in document.items() if key in ID_FIELDS or key in LEAN_FIELDS}
@@ -0,0 +1,304 @@
+import asyncio
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from itertools import islice
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from app.database import db
+from app.helpers import bson_json
+from app.helpers.lean import LEAN_FIELDS
+
+load_dotenv()
+# "algolia" (default) or "local" to serve /products from the in-process index only
+SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "algolia").lower()
+LOCAL_SEARCH_INDEX_PATH = os.getenv("LOCAL_SEARCH_INDEX_PATH", "/tmp/product_search_index.pkl")
+# Answer from the local index when Algolia errors, times out or rate-limits. Unset, it is on only when
+# scripts/build_search_index.py has written an index file: without one the first failure would wait for
+# a full products scan.
+LOCAL_SEARCH_FALLBACK = os.getenv(
+    "LOCAL_SEARCH_FALLBACK", "true" if os.path.exists(LOCAL_SEARCH_INDEX_PATH) else "false"
+).lower() in ("1", "true", "yes")
+# Fields kept in each hit; local results are a degraded answer, so the lean projection by default
+LOCAL_SEARCH_HIT_FIELDS = [field.strip() for field in os.getenv(
+    "LOCAL_SEARCH_HIT_FIELDS", ",".join(LEAN_FIELDS)
+).split(",") if field.strip()]
+LOCAL_SEARCH_REFRESH_INTERVAL = float(os.getenv("LOCAL_SEARCH_REFRESH_INTERVAL", "300"))
+# Full rebuilds pick up deletions, which incremental refreshes cannot see
+LOCAL_SEARCH_REBUILD_INTERVAL = float(os.getenv("LOCAL_SEARCH_REBUILD_INTERVAL", "86400"))
+PRODUCTS_COLLECTION = "products"
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text) -> list:
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _to_price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LocalSearchIndex:
+    """
+    Inverted index over product name and description with BM25 ranking and a price range filter.
+    Hits are stored in the same shape Algolia returns them, so routes can serve either, but only
+    with LOCAL_SEARCH_HIT_FIELDS to keep every instance's copy small.
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, name_boost: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.name_boost = name_boost
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.hits = {}                      # doc_id -> hit dict
+        self.prices = {}                    # doc_id -> float or None
+        self.doc_terms = {}                 # doc_id -> Counter of term frequencies
+        self.doc_lengths = {}               # doc_id -> weighted token count
+        self.postings = defaultdict(dict)   # term -> {doc_id: term frequency}
+        self.total_length = 0
+        self.last_id = None
+        self.last_updated = None
+        self.built_at = 0.0
+        # Lazily rebuilt (prices, doc_ids) pair sorted by price, for filter-only queries
+        self._price_order = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_price_order"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.hits)
+
+    def _terms_for(self, document: dict) -> Counter:
+        terms = Counter()
+        for token in tokenize(document.get("name")):
+            terms[token] += self.name_boost
+        for token in tokenize(document.get("description")):
+            terms[token] += 1
+        return terms
+
+    def remove_document(self, doc_id: str):
+        with self._lock:
+            terms = self.doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(doc_id, 0)
+            self.hits.pop(doc_id, None)
+            self.prices.pop(doc_id, None)
+            self._price_order = None
+
+    @staticmethod
+    def projection() -> dict:
+        """Mongo projection with the fields indexing and the stored hits need."""
+        fields = {"_id", "name", "description", "price", "updated_at", *LOCAL_SEARCH_HIT_FIELDS}
+        return {field: 1 for field in fields}
+
+    def add_document(self, document: dict):
+        """Indexes a raw Mongo document, replacing any previous version of it."""
+        doc_id = str(document["_id"])
+        hit = bson_json.to_jsonable({
+            key: value for key, value in document.items() if key == "_id" or key in LOCAL_SEARCH_HIT_FIELDS
+        })
+        hit["objectID"] = doc_id
+        terms = self._terms_for(document)
+        with self._lock:
+            self.remove_document(doc_id)
+            self.hits[doc_id] = hit
+            self.prices[doc_id] = _to_price(document.get("price"))
+            self.doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self.doc_lengths[doc_id] = length
+            self.total_length += length
+            for term, frequency in terms.items():
+                self.postings[term][doc_id] = frequency
+            self._price_order = None
+
+            if self.last_id is None or document["_id"] > self.last_id:
+                self.last_id = document["_id"]
+            updated_at = document.get("updated_at")
+            if updated_at is not None and (self.last_updated is None or updated_at > self.last_updated):
+                self.last_updated = updated_at
+
+    def build(self, collection):
+        """Indexes the whole collection from scratch."""
+        with self._lock:
+            self._reset()
+            for document in collection.find({}, self.projection()):
+                self.add_document(document)
+            self.built_at = time.time()
+
+    def refresh(self, collection) -> int:
+        """Re-indexes documents inserted or updated since the last build/refresh."""
+        query = {"_id": {"$gt": self.last_id}} if self.last_id is not None else {}
+        if self.last_updated is not None:
+            query = {"$or": [query, {"updated_at": {"$gt": self.last_updated}}]}
+        count = 0
+        for document in collection.find(query, self.projection()):
+            self.add_document(document)
+            count += 1
+        return count
+
+    def _ids_in_price_range(self, min_price, max_price) -> list:
+        if self._price_order is None:
+            ordered = sorted((price, doc_id) for doc_id, price in self.prices.items() if price is not None)
+            self._price_order = ([price for price, _ in ordered], [doc_id for _, doc_id in ordered])
+        prices, doc_ids = self._price_order
+        start = bisect_left(prices, min_price) if min_price is not None else 0
+        end = bisect_right(prices, max_price) if max_price is not None else len(prices)
+        return doc_ids[start:end]
+
+    def _price_matches(self, doc_id: str, min_price, max_price) -> bool:
+        if min_price is None and max_price is None:
+            return True
+        price = self.prices.get(doc_id)
+        if price is None:
+            return False
+        return (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+
+    def search(self, query: str = "", min_price=None, max_price=None, limit: int = 10, page: int = 0) -> list:
+        """Returns one page of hits. `page` is zero-based, as in Algolia."""
+        terms = set(tokenize(query))
+        offset = max(page, 0) * limit
+        with self._lock:
+            if not terms:
+                if min_price is None and max_price is None:
+                    doc_ids = list(islice(self.hits, offset, offset + limit))
+                else:
+                    doc_ids = self._ids_in_price_range(min_price, max_price)[offset:offset + limit]
+                return [self.hits[doc_id] for doc_id in doc_ids]
+
+            total_docs = len(self.hits)
+            if not total_docs:
+                return []
+            average_length = self.total_length / total_docs
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            ranked = heapq.nlargest(
+                offset + limit,
+                ((score, doc_id) for doc_id, score in scores.items() if self._price_matches(doc_id, min_price, max_price))
+            )
+            return [self.hits[doc_id] for _, doc_id in ranked[offset:]]
+
+    def save(self, path: str):
+        """Writes the index to disk so a cold process can start without a full Mongo scan."""
+        tmp_path = f"{path}.tmp"
+        with self._lock, open(tmp_path, "wb") as f:
+            pickle.dump((self.FORMAT_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Loads an index written by save(). Returns None if the file is missing or outdated."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            version, index = pickle.load(f)
+        if version != cls.FORMAT_VERSION:
+            return None
+        return index
+
+
+_index: LocalSearchIndex | None = None
+_refreshed_at = 0.0
+_load_lock = asyncio.Lock()
+_refresh_task = None
+
+
+def load_or_build(path: str = LOCAL_SEARCH_INDEX_PATH) -> LocalSearchIndex:
+    """Warm-starts from disk and catches up incrementally, or builds from Mongo if there is no usable file."""
+    collection = db[PRODUCTS_COLLECTION]
+    index = None
+    try:
+        index = LocalSearchIndex.load(path)
+    except Exception as e:
+        print(f"Could not load local search index from {path}: {e}")
+
+    if index is None or time.time() - index.built_at >= LOCAL_SEARCH_REBUILD_INTERVAL:
+        index = LocalSearchIndex()
+        index.build(collection)
+    else:
+        index.refresh(collection)
+
+    try:
+        index.save(path)
+    except OSError as e:
+        print(f"Could not save local search index to {path}: {e}")
+    return index
+
+
+def _refresh_index():
+    global _index, _refreshed_at
+    collection = db[PRODUCTS_COLLECTION]
+    if time.time() - _index.built_at >= LOCAL_SEARCH_REBUILD_INTERVAL:
+        fresh = LocalSearchIndex()
+        fresh.build(collection)
+        _index = fresh
+    else:
+        _index.refresh(collection)
+    _refreshed_at = time.monotonic()
+
+
+async def _background_refresh():
+    global _refresh_task
+    try:
+        await run_in_threadpool(_refresh_index)
+    except Exception as e:
+        print(f"Local search index refresh failed: {e}")
+    finally:
+        _refresh_task = None
+
+
+async def get_index() -> LocalSearchIndex:
+    """Returns the process-wide index, loading it on first use and refreshing it in the background."""
+    global _index, _refreshed_at, _refresh_task
+    if _index is None:
+        async with _load_lock:
+            if _index is None:
+                _index = await run_in_threadpool(load_or_build)
+                _refreshed_at = time.monotonic()
+    elif _refresh_task is None and time.monotonic() - _refreshed_at >= LOCAL_SEARCH_REFRESH_INTERVAL:
+        _refresh_task = asyncio.create_task(_background_refresh())
+    return _index
+
+
+async def search_products(query: str, min_price, max_price, limit: int, page: int) -> list:
+    index = await get_index()
+    # BM25 over every posting of the query terms is CPU-bound, keep it off the event loop
+    return await run_in_threadpool(index.search, query, min_price, max_price, limit, page)
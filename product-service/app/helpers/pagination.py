@@ -0,0 +1,55 @@
+import base64
+import json
+import os
+import time
+from bson import ObjectId
+from dotenv import load_dotenv
+
+load_dotenv()
+CATEGORY_COUNT_TTL = float(os.getenv("CATEGORY_COUNT_TTL", "60"))
+
+
+def encode_cursor(last_id: ObjectId, scope: str) -> str:
+    """Builds an opaque continuation token pointing just after `last_id` within `scope`."""
+    raw = json.dumps({"id": str(last_id), "scope": scope}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, scope: str) -> ObjectId:
+    """Returns the last seen ObjectId. Raises ValueError for malformed tokens or tokens from another scope."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = ObjectId(data["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if data.get("scope") != scope:
+        raise ValueError("Cursor does not belong to this query")
+    return last_id
+
+
+class CountCache:
+    """Short-lived cache of count_documents results, keyed by an arbitrary hashable."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._counts = {}
+
+    async def get(self, key, compute):
+        """Returns the cached count, awaiting `compute()` when it is missing or expired."""
+        now = time.monotonic()
+        entry = self._counts.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        count = await compute()
+        self._counts[key] = (count, now + self.ttl)
+        return count
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._counts.clear()
+        else:
+            self._counts.pop(key, None)
+
+
+category_counts = CountCache(CATEGORY_COUNT_TTL)
@@ -0,0 +1,187 @@
+import orjson
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, List
+from bson import ObjectId
+from dotenv import load_dotenv
+from app.database import async_db, async_demo_db
+from app.helpers.redis_client import get_redis
+from app.helpers import bson_json
+
+load_dotenv()
+PRODUCT_CACHE_ENABLED = os.getenv("PRODUCT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Memory budget of the in-process tier, measured on the serialized documents
+PRODUCT_CACHE_MAX_BYTES = int(os.getenv("PRODUCT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# The local tier cannot see invalidations made by other instances, so keep it short-lived
+PRODUCT_CACHE_LOCAL_TTL = float(os.getenv("PRODUCT_CACHE_LOCAL_TTL", "60"))
+PRODUCT_CACHE_REDIS_TTL = int(os.getenv("PRODUCT_CACHE_REDIS_TTL", "3600"))
+
+
+class ProductCache:
+    """
+    Read-through cache of product documents keyed by ObjectId.
+    Tier one is an in-process LRU bounded by serialized size, tier two is the shared Redis.
+    Cached documents are already in the extended JSON form the routes return.
+    """
+
+    def __init__(self, get_collection: Callable, redis_prefix: str, max_bytes: int, local_ttl: float, redis_ttl: int, enabled: bool = True):
+        self.enabled = enabled
+        self.get_collection = get_collection
+        self.redis_prefix = redis_prefix
+        self.max_bytes = max_bytes
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self._entries: OrderedDict = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _drop_local(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def _store_local(self, key: str, doc: dict, size: int):
+        self._drop_local(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (doc, size, time.monotonic())
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def _get_local(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        doc, _, stored_at = entry
+        if time.monotonic() - stored_at >= self.local_ttl:
+            self._drop_local(key)
+            return None
+        self._entries.move_to_end(key)
+        return doc
+
+    async def _get_redis(self, keys: List[str]) -> dict:
+        redis_client = get_redis()
+        if redis_client is None or not keys:
+            return {}
+        try:
+            values = await redis_client.mget([self.redis_prefix + key for key in keys])
+        except Exception as e:
+            print(f"Product cache Redis read failed: {e}")
+            return {}
+        found = {}
+        for key, raw in zip(keys, values):
+            if raw is not None:
+                found[key] = (orjson.loads(raw), len(raw))
+        return found
+
+    async def _set_redis(self, serialized: dict):
+        redis_client = get_redis()
+        if redis_client is None or not serialized:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for key, raw in serialized.items():
+                    pipe.set(self.redis_prefix + key, raw, ex=self.redis_ttl)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Product cache Redis write failed: {e}")
+
+    async def _load_from_mongo(self, object_ids: List[ObjectId]) -> dict:
+        collection = self.get_collection()
+        if len(object_ids) == 1:
+            documents = [await collection.find_one({"_id": object_ids[0]})]
+        else:
+            documents = await collection.find({"_id": {"$in": object_ids}}).to_list()
+        serialized = {}
+        for document in documents:
+            if document:
+                serialized[str(document["_id"])] = bson_json.dumps(document)
+        return serialized
+
+    async def get_many(self, object_ids: List[ObjectId]) -> dict:
+        """Returns {str(id): document} for every id that exists. Mongo is queried only for misses."""
+        if not self.enabled:
+            serialized = await self._load_from_mongo(list(object_ids))
+            return {key: orjson.loads(raw) for key, raw in serialized.items()}
+
+        found = {}
+        missing = []
+        for object_id in object_ids:
+            key = str(object_id)
+            if key in found:
+                continue
+            doc = self._get_local(key)
+            if doc is not None:
+                self.hits += 1
+                found[key] = doc
+            else:
+                missing.append(key)
+
+        if missing:
+            for key, (doc, size) in (await self._get_redis(missing)).items():
+                self.redis_hits += 1
+                self._store_local(key, doc, size)
+                found[key] = doc
+            missing = [key for key in missing if key not in found]
+
+        if missing:
+            self.misses += len(missing)
+            serialized = await self._load_from_mongo([ObjectId(key) for key in missing])
+            for key, raw in serialized.items():
+                doc = orjson.loads(raw)
+                self._store_local(key, doc, len(raw))
+                found[key] = doc
+            await self._set_redis(serialized)
+
+        return found
+
+    async def get(self, object_id: ObjectId):
+        """Returns the serialized document, or None if it does not exist."""
+        return (await self.get_many([object_id])).get(str(object_id))
+
+    async def invalidate(self, object_id: ObjectId):
+        """Removes a document from both tiers, e.g. after it was updated."""
+        key = str(object_id)
+        self._drop_local(key)
+        redis_client = get_redis()
+        if redis_client is not None:
+            try:
+                await redis_client.delete(self.redis_prefix + key)
+            except Exception as e:
+                print(f"Product cache Redis delete failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.redis_hits) / lookups if lookups else 0.0
+        }
+
+
+product_cache = ProductCache(
+    get_collection=lambda: async_db["products"],
+    redis_prefix="product:",
+    max_bytes=PRODUCT_CACHE_MAX_BYTES,
+    local_ttl=PRODUCT_CACHE_LOCAL_TTL,
+    redis_ttl=PRODUCT_CACHE_REDIS_TTL,
+    enabled=PRODUCT_CACHE_ENABLED
+)
+
+amazon_product_cache = ProductCache(
+    get_collection=lambda: async_demo_db["products_trial_categories"],
+    redis_prefix="amazon_product:",
+    max_bytes=PRODUCT_CACHE_MAX_BYTES,
+    local_ttl=PRODUCT_CACHE_LOCAL_TTL,
+    redis_ttl=PRODUCT_CACHE_REDIS_TTL,
+    enabled=PRODUCT_CACHE_ENABLED
+)
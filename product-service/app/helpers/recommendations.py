@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+from typing import List
+from dotenv import load_dotenv
+from app.helpers import algolia_client, lean
+from app.helpers.background import run_in_background
+from app.helpers.redis_client import get_redis
+from app.helpers.search_cache import SearchCache
+from app.helpers.single_flight import product_flight
+
+load_dotenv()
+# Recommendations move slowly, so entries live for a day and may be served stale for another
+RECOMMEND_CACHE_ENABLED = os.getenv("RECOMMEND_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RECOMMEND_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", "86400"))
+RECOMMEND_CACHE_STALE_TTL = float(os.getenv("RECOMMEND_CACHE_STALE_TTL", "86400"))
+RECOMMEND_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMEND_CACHE_MAX_ENTRIES", "5000"))
+# Sorted set of product id -> page views, read by the precompute job
+PRODUCT_VIEWS_KEY = os.getenv("PRODUCT_VIEWS_KEY", "product_views")
+RECOMMEND_THRESHOLD = 42.1
+
+recommend_cache = SearchCache(
+    max_entries=RECOMMEND_CACHE_MAX_ENTRIES,
+    ttl=RECOMMEND_CACHE_TTL,
+    stale_ttl=RECOMMEND_CACHE_STALE_TTL,
+    redis_prefix="recommend:"
+)
+
+
+def make_recommend_key(product_id: str, max_recommendations: int, lean_mode: bool = False) -> str:
+    return json.dumps([product_id.lower(), max_recommendations, lean_mode])
+
+
+async def fetch_recommendations(product_id: str, max_recommendations: int, lean_mode: bool = False):
+    """Calls the Algolia Recommend API. Returns the hits, or None when Algolia answered with an error."""
+    recommend_request = {
+        "indexName": algolia_client.INDEX_NAME,
+        "objectID": product_id,
+        "model": "related-products",
+        "maxRecommendations": max_recommendations,
+        "threshold": RECOMMEND_THRESHOLD
+    }
+    if lean_mode:
+        recommend_request["queryParameters"] = lean.recommend_query_parameters()
+
+    data = await algolia_client.recommend([recommend_request])
+    if "results" not in data:
+        return None
+    if not data["results"]:
+        return []
+    return data["results"][0].get("hits", [])
+
+
+async def get_recommendations(product_id: str, max_recommendations: int, lean_mode: bool = False):
+    """Cached recommendations for a product. Concurrent misses for the same key share one Algolia call."""
+    key = make_recommend_key(product_id, max_recommendations, lean_mode)
+
+    async def fetch():
+        return await product_flight.do(
+            ("recommend", key), lambda: fetch_recommendations(product_id, max_recommendations, lean_mode)
+        )
+
+    if not RECOMMEND_CACHE_ENABLED:
+        return await fetch()
+    return await recommend_cache.get_or_fetch(key, fetch, cacheable=lambda value: value is not None)
+
+
+async def _increment_view(product_id: str):
+    redis_client = get_redis()
+    if redis_client is None:
+        return
+    try:
+        await redis_client.zincrby(PRODUCT_VIEWS_KEY, 1, product_id)
+    except Exception as e:
+        print(f"Product view counter failed: {e}")
+
+
+def record_view(product_id: str):
+    """Counts a product page view without making the request wait for Redis."""
+    if get_redis() is None:
+        return
+    run_in_background(_increment_view(product_id.lower()))
+
+
+async def top_viewed(limit: int) -> List[str]:
+    """Returns the ids of the most viewed products, most viewed first."""
+    redis_client = get_redis()
+    if redis_client is None:
+        return []
+    product_ids = await redis_client.zrevrange(PRODUCT_VIEWS_KEY, 0, limit - 1)
+    return [product_id.decode() if isinstance(product_id, bytes) else product_id for product_id in product_ids]
+
+
+async def precompute(product_ids: List[str], max_recommendations: List[int], lean_modes: List[bool], concurrency: int = 8) -> dict:
+    """Fetches and stores recommendations for every (product, size, lean) combination. Returns counts by outcome."""
+    semaphore = asyncio.Semaphore(concurrency)
+    outcome = {"stored": 0, "failed": 0}
+
+    async def warm(product_id: str, size: int, lean_mode: bool):
+        async with semaphore:
+            try:
+                hits = await fetch_recommendations(product_id, size, lean_mode)
+            except Exception as e:
+                print(f"Recommendations for {product_id} failed: {e}")
+                hits = None
+            if hits is None:
+                outcome["failed"] += 1
+                return
+            await recommend_cache.put(make_recommend_key(product_id, size, lean_mode), hits)
+            outcome["stored"] += 1
+
+    await asyncio.gather(*[
+        warm(product_id, size, lean_mode)
+        for product_id in product_ids
+        for size in max_recommendations
+        for lean_mode in lean_modes
+    ])
+    return outcome
@@ -0,0 +1,39 @@
+import os
+from typing import TYPE_CHECKING
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+load_dotenv()
+
+# Shared cache tier. Leave unset to run with in-process caches only.
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+
+_client: "redis.Redis | None" = None
+
+
+def get_redis() -> "redis.Redis | None":
+    """Returns the process-wide Redis client, or None when no Redis tier is configured."""
+    global _client
+    if not REDIS_URL:
+        return None
+    if _client is None:
+        # Only imported when a Redis tier is configured
+        import redis.asyncio as redis
+        _client = redis.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT
+        )
+    return _client
+
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
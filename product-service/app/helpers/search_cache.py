@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from dotenv import load_dotenv
+from app.helpers.background import run_in_background
+from app.helpers.redis_client import get_redis
+
+load_dotenv()
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "60"))
+# How long past the TTL a stale result may still be served while it is refreshed
+SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "300"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+SEARCH_CACHE_USE_REDIS = os.getenv("SEARCH_CACHE_USE_REDIS", "true").lower() in ("1", "true", "yes")
+SEARCH_CACHE_REDIS_PREFIX = "search:"
+
+
+def make_search_key(query: str, min_price, max_price, limit: int, page: int, lean: bool = False) -> str:
+    """Normalizes the search inputs so equivalent requests share a cache entry."""
+    normalized_query = " ".join((query or "").lower().split())
+    key = [normalized_query, min_price, max_price, limit, page]
+    # Lean results hold fewer fields, so they get their own entries
+    if lean:
+        key.append("lean")
+    return json.dumps(key)
+
+
+class SearchCache:
+    """
+    TTL cache for search results with an in-process LRU tier and an optional Redis tier.
+    Entries past their TTL but within the stale window are served immediately while a
+    single background task refreshes them.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float, use_redis: bool = True, redis_prefix: str = SEARCH_CACHE_REDIS_PREFIX):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.use_redis = use_redis
+        self.redis_prefix = redis_prefix
+        self._entries: OrderedDict = OrderedDict()
+        self._refreshing: set = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+
+    def _redis_key(self, key: str) -> str:
+        return self.redis_prefix + hashlib.sha1(key.encode()).hexdigest()
+
+    def _store_local(self, key: str, value, stored_at: float):
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load_redis(self, key: str):
+        redis_client = get_redis() if self.use_redis else None
+        if redis_client is None:
+            return None
+        try:
+            raw = await redis_client.get(self._redis_key(key))
+        except Exception as e:
+            print(f"Search cache Redis read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["stored_at"]
+
+    async def _store(self, key: str, value):
+        stored_at = time.time()
+        self._store_local(key, value, stored_at)
+        redis_client = get_redis() if self.use_redis else None
+        if redis_client is None:
+            return
+        try:
+            await redis_client.set(
+                self._redis_key(key),
+                json.dumps({"value": value, "stored_at": stored_at}),
+                ex=int(self.ttl + self.stale_ttl) or 1
+            )
+        except Exception as e:
+            print(f"Search cache Redis write failed: {e}")
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable], cacheable: Callable):
+        try:
+            value = await fetch()
+            if cacheable(value):
+                await self._store(key, value)
+        except Exception as e:
+            print(f"Search cache refresh failed for {key}: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Awaitable], cacheable: Callable):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        run_in_background(self._refresh(key, fetch, cacheable))
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable],
+        cacheable: Optional[Callable] = None
+    ):
+        """Returns the cached value for `key`, calling `fetch` only on a full miss."""
+        cacheable = cacheable or (lambda value: True)
+
+        entry = self._entries.get(key)
+        from_redis = False
+        if entry is None:
+            entry = await self._load_redis(key)
+            from_redis = entry is not None
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl + self.stale_ttl:
+                if from_redis:
+                    self.redis_hits += 1
+                    self._store_local(key, value, stored_at)
+                else:
+                    self._entries.move_to_end(key)
+                if age < self.ttl:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._schedule_refresh(key, fetch, cacheable)
+                return value
+            self._entries.pop(key, None)
+
+        self.misses += 1
+        value = await fetch()
+        if cacheable(value):
+            await self._store(key, value)
+        return value
+
+    async def put(self, key: str, value):
+        """Stores a value computed elsewhere, e.g. by a warm-up job."""
+        await self._store(key, value)
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drops one key, or the whole local tier when no key is given."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshing": len(self._refreshing)
+        }
+
+
+search_cache = SearchCache(
+    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    ttl=SEARCH_CACHE_TTL,
+    stale_ttl=SEARCH_CACHE_STALE_TTL,
+    use_redis=SEARCH_CACHE_USE_REDIS
+)
@@ -0,0 +1,61 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+SINGLE_FLIGHT_PRODUCT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_PRODUCT_TIMEOUT", "5"))
+SINGLE_FLIGHT_SEARCH_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_SEARCH_TIMEOUT", "6"))
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight backend call.
+    The call runs as its own task, so a caller that disconnects does not cancel it for the others.
+    """
+
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self._inflight = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _finished(self, key, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter has gone away
+        if not task.cancelled() and task.exception() is not None:
+            if isinstance(task.exception(), asyncio.TimeoutError):
+                self.timeouts += 1
+            else:
+                self.errors += 1
+
+    async def do(self, key, fn: Callable[[], Awaitable], timeout: Optional[float] = None):
+        """Runs `fn` for `key`, or waits for the identical call already in flight. `timeout` bounds the shared call."""
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(asyncio.wait_for(fn(), timeout if timeout is not None else self.timeout))
+            self._inflight[key] = task
+            task.add_done_callback(lambda finished: self._finished(key, finished))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        requests = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / requests if requests else 0.0,
+            "timeouts": self.timeouts,
+            "errors": self.errors
+        }
+
+
+product_flight = SingleFlight("product", SINGLE_FLIGHT_PRODUCT_TIMEOUT)
+search_flight = SingleFlight("search", SINGLE_FLIGHT_SEARCH_TIMEOUT)
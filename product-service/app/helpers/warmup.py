@@ -0,0 +1,62 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+# "true" warms every cold start, "provisioned" only provisioned-concurrency environments, anything else disables it
+WARMUP_ON_INIT = os.getenv("WARMUP_ON_INIT", "false").lower()
+
+
+def should_warm_up() -> bool:
+    if WARMUP_ON_INIT in ("1", "true", "yes"):
+        return True
+    if WARMUP_ON_INIT == "provisioned":
+        return os.getenv("AWS_LAMBDA_INITIALIZATION_TYPE") == "provisioned-concurrency"
+    return False
+
+
+async def _ping_mongo():
+    from app.database import async_db
+    await async_db.command("ping")
+
+
+async def _open_algolia():
+    from app.helpers import algolia_client
+    # Opens the pooled connection (DNS + TLS) without running a billable search
+    await algolia_client.get_client().get("/1/isalive")
+
+
+async def _ping_redis():
+    from app.helpers.redis_client import get_redis
+    redis_client = get_redis()
+    if redis_client is not None:
+        await redis_client.ping()
+
+
+async def _load_categories():
+    from app.helpers.category_snapshot import category_snapshot
+    await category_snapshot.get()
+
+
+def warm_up() -> dict:
+    """
+    Opens the lazily created clients and fills the category snapshot during Lambda init, so the first
+    request does not pay for them. Runs on the loop Mangum serves requests from, which the async
+    clients bind to. Returns the milliseconds spent per step; failed steps are logged and skipped.
+    """
+    loop = asyncio.get_event_loop()
+    timings = {}
+    for name, step in (
+        ("mongo", _ping_mongo),
+        ("algolia", _open_algolia),
+        ("redis", _ping_redis),
+        ("categories", _load_categories),
+    ):
+        start = time.perf_counter()
+        try:
+            loop.run_until_complete(step())
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e}")
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
@@ -1,63 +1,100 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
+from fastapi import APIRouter, HTTPException, Header, Query, Response
 import os
 from dotenv import load_dotenv
-from app.database import db
-from bson import json_util
-import json
+from app.helpers import algolia_client
+from app.helpers.category_snapshot import category_snapshot, etag_matches
 from bson import ObjectId
-import requests
+from pydantic import BaseModel
+from typing import List
 
 load_dotenv()
-ALGOLIA_APP_ID = os.getenv("ALGOLIA_ID")
-ALGOLIA_API_KEY = os.getenv("ALGOLIA_ADMIN_KEY")
-INDEX_NAME = "product_index"
+BATCH_SEARCH_MAX_QUERIES = int(os.getenv("BATCH_SEARCH_MAX_QUERIES", "50"))
 
 router = APIRouter(prefix="/products")
+
+
+def category_search_params(category_query: str, limit: int, page: int) -> str:
+    return f"query={category_query}&hitsPerPage={limit}&page={page}&optionalWords={category_query}"
+
     
 @router.get("/categories")
-def get_categories():
-    categories_collection = db["amazonCategories"]
+async def get_categories(if_none_match: str = Header(None)):
     try:
-        documents = categories_collection.find()
-        if not documents:
-            raise HTTPException(status_code=404, detail="Categories are not being retreived")
-        
-        serialized_docs = json.loads(json_util.dumps(documents))
-        return {
-            "message": "Successfully retrieved all categories",
-            "payload": serialized_docs
-        }
+        body, etag, _ = await category_snapshot.get()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=body, media_type="application/json", headers=headers)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/category/{category_id}")
-def get_products(category_id: str, limit: int = Query(10), page: int = Query(1)):
+async def get_products(category_id: str, limit: int = Query(10), page: int = Query(1)):
     try:
-        collection = db["amazonCategories"]
         object_id = ObjectId(category_id)
-        doc = collection.find_one({"_id": object_id})
+        _, _, categories_by_id = await category_snapshot.get()
+        doc = categories_by_id.get(str(object_id))
 
         if not doc or "category" not in doc:
             return {"message": "Category not found", "payload": []}
 
-        category_query = doc["category"]
-        url = f"https://{ALGOLIA_APP_ID}-dsn.algolia.net/1/indexes/{INDEX_NAME}/query"
-        headers = {
-            "X-Algolia-API-Key": ALGOLIA_API_KEY,
-            "X-Algolia-Application-Id": ALGOLIA_APP_ID,
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "params": f"query={category_query}&hitsPerPage={limit}&page={page}&optionalWords={category_query}"
-        }
+        params = category_search_params(doc["category"], limit, page)
 
-        response = requests.post(url, headers=headers, json=payload)
-        data = response.json()
+        data = await algolia_client.search(params)
         hits = data.get('hits', [])
 
         return {"message": "Products retrieved successfully", "payload": hits}
 
     except Exception as e:
         print(f"Error: {e}")
-        return {"message": "Something went wrong", "error": str(e), "payload": []}
\ No newline at end of file
+        return {"message": "Something went wrong", "error": str(e), "payload": []}
+
+
+class BatchSearchRequest(BaseModel):
+    category_ids: List[str] = []
+    queries: List[str] = []
+    limit: int = 10
+    page: int = 1
+
+@router.post("/category/batch")
+async def get_products_for_categories(request: BatchSearchRequest):
+    total_queries = len(request.category_ids) + len(request.queries)
+    if not total_queries:
+        raise HTTPException(status_code=400, detail="Provide at least one category id or query")
+    if total_queries > BATCH_SEARCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_SEARCH_MAX_QUERIES} categories and queries per request")
+
+    try:
+        # Every input gets an entry, unknown categories keep an empty list
+        results = {
+            "categories": {category_id: [] for category_id in request.category_ids},
+            "queries": {query: [] for query in request.queries}
+        }
+
+        object_ids = [ObjectId(category_id) for category_id in request.category_ids if ObjectId.is_valid(category_id)]
+        categories_by_id = await category_snapshot.lookup(object_ids)
+
+        targets = []
+        params_list = []
+        for category_id in request.category_ids:
+            doc = categories_by_id.get(category_id.lower())
+            if doc and "category" in doc:
+                targets.append(("categories", category_id))
+                params_list.append(category_search_params(doc["category"], request.limit, request.page))
+        for query in request.queries:
+            targets.append(("queries", query))
+            params_list.append(f"query={query}&hitsPerPage={request.limit}&page={request.page}")
+
+        # All searches go to Algolia in a single multi-query request
+        if params_list:
+            responses = await algolia_client.multi_search(params_list)
+            for (section, key), response in zip(targets, responses):
+                results[section][key] = response.get("hits", [])
+
+        return {"message": "Products retrieved successfully", "payload": results}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
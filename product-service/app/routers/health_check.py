@@ -1,12 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Path
-import os
-from dotenv import load_dotenv
-from app.database import db
-import requests
-import json
-from bson import ObjectId, json_util
-from pydantic import BaseModel
-from typing import List
+from fastapi import APIRouter
 
 router = APIRouter(prefix="/products")
 @router.get("/health-check")
@@ -1,38 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Path, Response
+from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi.responses import StreamingResponse, FileResponse
 import os
 from dotenv import load_dotenv
-from app.database import db, demo_db
-import requests
-import json
-from bson import ObjectId, json_util
+from app.database import async_demo_db
+from app.helpers import algolia_client, search_cache, local_search, csv_export, pagination, lean, autocomplete
+from app.helpers.product_cache import product_cache, amazon_product_cache
+from app.helpers.category_summary import category_summary
+from app.helpers import catalog_snapshot
+from app.helpers.bson_json import MongoJSONResponse
+from app.helpers.single_flight import product_flight, search_flight
+from app.helpers import recommendations as recommendations_helper
+import asyncio
+from bson import ObjectId
 from pydantic import BaseModel
 from typing import List
-import csv
-import io
 
 load_dotenv()
-ALGOLIA_APP_ID = os.getenv("ALGOLIA_ID")
-ALGOLIA_API_KEY = os.getenv("ALGOLIA_ADMIN_KEY")
-INDEX_NAME = "product_index"
 
 router = APIRouter(prefix="/products")
 
 @router.get("")
-def get_products(
+async def get_products(
         query: str = Query(""),
         limit: int = Query(10),
          page: int = Query(1, ge=0),
          min_price: int = Query(None, ge=0),
-         max_price: int = Query(None, ge=0)
+         max_price: int = Query(None, ge=0),
+         lean_mode: bool = Query(lean.LEAN_RESPONSES_DEFAULT, alias="lean")
     ):
 
-    url = f"https://{ALGOLIA_APP_ID}-dsn.algolia.net/1/indexes/{INDEX_NAME}/query"
-    headers = {
-        "X-Algolia-API-Key": ALGOLIA_API_KEY,
-        "X-Algolia-Application-Id": ALGOLIA_APP_ID,
-        "Content-Type": "application/json"
-    }
-
     filters = []
     if min_price is not None:
         filters.append(f"price >= {min_price}")
@@ -49,84 +45,153 @@ def get_products(
         query_params.append(f"query={query}")
     if filters_str:
         query_params.append(f"filters={filters_str}")
+    if lean_mode:
+        query_params.append(lean.search_params())
 
     params_str = "&".join(query_params)
-    payload = {"params": params_str}
-    
-    response = requests.post(url, headers=headers, json=payload)
-    data = response.json()
-    
-    hits = data.get('hits', [])
+
+    if local_search.SEARCH_ENGINE == "local":
+        hits = await local_search.search_products(query, min_price, max_price, limit, page)
+        if lean_mode:
+            hits = [lean.project(hit) for hit in hits]
+        return {"message": "Products retrieved successfully", "payload": hits}
+
+    async def fetch_hits():
+        try:
+            # Identical searches already in flight share one Algolia call
+            data = await search_flight.do(params_str, lambda: algolia_client.search(params_str))
+        except (algolia_client.AlgoliaError, asyncio.TimeoutError) as e:
+            if not local_search.LOCAL_SEARCH_FALLBACK:
+                raise
+            print(f"Algolia search failed, using local index: {e}")
+            return None
+        # None marks an error response from Algolia, which is never cached
+        return data.get('hits')
+
+    if search_cache.SEARCH_CACHE_ENABLED:
+        cache_key = search_cache.make_search_key(query, min_price, max_price, limit, page, lean_mode)
+        hits = await search_cache.search_cache.get_or_fetch(
+            cache_key, fetch_hits, cacheable=lambda value: value is not None
+        )
+    else:
+        hits = await fetch_hits()
+
+    if hits is None and local_search.LOCAL_SEARCH_FALLBACK:
+        hits = await local_search.search_products(query, min_price, max_price, limit, page)
+        if lean_mode:
+            hits = [lean.project(hit) for hit in hits]
     
-    return {"message": "Products retrieved successfully", "payload": hits}
+    return {"message": "Products retrieved successfully", "payload": hits or []}
+
+
+@router.get("/autocomplete")
+async def get_autocomplete_suggestions(
+        q: str = Query(""),
+        limit: int = Query(10, ge=1, le=autocomplete.AUTOCOMPLETE_MAX_SUGGESTIONS)
+    ):
+    # Served from the in-process prefix index, typeahead never reaches Algolia or Mongo
+    try:
+        suggestions = await autocomplete.suggest(q, limit)
+        return {"message": "Suggestions retrieved successfully", "payload": suggestions}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/autocomplete/stats")
+async def get_autocomplete_stats():
+    index = autocomplete.get_index()
+    # Still building in the background
+    if index is None:
+        return {"message": "Autocomplete index is not ready yet", "payload": None}
+    return {"message": "Autocomplete index statistics", "payload": index.stats()}
+
+
+@router.get("/search-cache/stats")
+def get_search_cache_stats():
+    return {"message": "Search cache statistics", "payload": search_cache.search_cache.stats()}
+
+
+@router.get("/recommend-cache/stats")
+def get_recommend_cache_stats():
+    return {"message": "Recommendation cache statistics", "payload": recommendations_helper.recommend_cache.stats()}
+
+
+@router.get("/single-flight/stats")
+def get_single_flight_stats():
+    return {
+        "message": "Request coalescing statistics",
+        "payload": {
+            "products": product_flight.stats(),
+            "search": search_flight.stats()
+        }
+    }
+
+
+@router.get("/product-cache/stats")
+def get_product_cache_stats():
+    return {
+        "message": "Product cache statistics",
+        "payload": {
+            "products": product_cache.stats(),
+            "amazon_products": amazon_product_cache.stats()
+        }
+    }
+
+
+@router.delete("/product-cache/{product_id}")
+async def invalidate_cached_product(product_id: str):
+    if not ObjectId.is_valid(product_id):
+        raise HTTPException(status_code=400, detail="Invalid product ID")
+
+    object_id = ObjectId(product_id)
+    await product_cache.invalidate(object_id)
+    await amazon_product_cache.invalidate(object_id)
+
+    return {"message": "Product removed from cache", "product_id": product_id}
 
 
 
 
 @router.get("/product/{product_id}")
-def get_product(product_id: str):
+async def get_product(product_id: str):
     try:
         print(product_id)
         if not ObjectId.is_valid(product_id):
             raise HTTPException(status_code=400, detail="Invalid product ID")
 
-        collection = db["products"]
         object_id = ObjectId(product_id)
         
-        document = collection.find_one({"_id": object_id})
+        serialized_doc = await product_flight.do(("products", product_id), lambda: product_cache.get(object_id))
 
-        if not document:
+        if not serialized_doc:
             raise HTTPException(status_code=404, detail="Product not found")
-        serialized_doc = json.loads(json_util.dumps(document))
 
-        return {
+        # Feeds the top-N list used to precompute recommendations
+        recommendations_helper.record_view(product_id)
+
+        return MongoJSONResponse({
             "message": "Successfully retrieved the product",
             "payload": serialized_doc
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/recommend/{product_id}")
-def recommend_products(product_id: str = Path(...), max_recommendations: int = Query(10)):
+async def recommend_products(
+        product_id: str = Path(...),
+        max_recommendations: int = Query(10),
+        lean_mode: bool = Query(lean.LEAN_RESPONSES_DEFAULT, alias="lean")
+    ):
     try:
         if not ObjectId.is_valid(product_id):
             raise HTTPException(status_code=400, detail="Invalid product ID")
-        collection = db["products"]
-        object_id = ObjectId(product_id)
-        document = collection.find_one({"_id": object_id})
+        # Cached per (product, size); the product itself is not loaded, Algolia already knows it
+        recommendations = await recommendations_helper.get_recommendations(product_id, max_recommendations, lean_mode)
 
-        if not document:
-            raise HTTPException(status_code=404, detail="Product not found")
-        algolia_object_id = str(document["_id"])
-
-        url = f"https://{ALGOLIA_APP_ID}-dsn.algolia.net/1/indexes/*/recommendations"
-        headers = {
-            "X-Algolia-API-Key": ALGOLIA_API_KEY,
-            "X-Algolia-Application-Id": ALGOLIA_APP_ID,
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "requests": [
-                {
-                    "indexName": INDEX_NAME,
-                    "objectID": product_id,
-                    "model": "related-products",
-                    "maxRecommendations": max_recommendations,
-                    "threshold": 42.1
-                }
-            ]
-        }
-
-        response = requests.post(url, headers=headers, json=payload)
-        data = response.json()
-
-        if "results" not in data or not data["results"]:
+        if not recommendations:
             return {"message": "No related products found", "payload": []}
 
-        recommendations = data["results"][0].get("hits", [])
-
         return {
             "message": "Related products retrieved successfully",
             "payload": recommendations
@@ -139,37 +204,40 @@ class ProductIdsRequest(BaseModel):
     product_ids: List[str]
     
 @router.post("/multiple-products")
-def get_multiple_products(request: ProductIdsRequest):
+async def get_multiple_products(request: ProductIdsRequest, lean_mode: bool = Query(lean.LEAN_RESPONSES_DEFAULT, alias="lean")):
     try:
         valid_ids = [ObjectId(pid) for pid in request.product_ids if ObjectId.is_valid(pid)]
 
         if not valid_ids:
             raise HTTPException(status_code=400, detail="No valid product IDs provided")
 
-        collection = db["products"]
-        documents = collection.find({"_id": {"$in": valid_ids}})
-        docs_list = list(documents)
+        # Only the ids missing from the cache go to Mongo
+        found = await product_cache.get_many(valid_ids)
+        serialized_docs = list(found.values())
+        if lean_mode:
+            serialized_docs = [lean.project(doc) for doc in serialized_docs]
 
-        if not docs_list:
+        if not serialized_docs:
             raise HTTPException(status_code=404, detail="No products found")
 
-        serialized_docs = json.loads(json_util.dumps(docs_list))
-
-        return {
+        return MongoJSONResponse({
             "message": "Successfully retrieved products",
             "payload": serialized_docs
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/amazon/categories")
-def get_unique_amazon_categories():
+async def get_unique_amazon_categories():
     try:
-        collection = demo_db["products_trial_categories"]
-
-        categories = collection.distinct("amazon_cat")
+        summary = await category_summary.get()
+        if summary:
+            categories = [entry["_id"] for entry in summary]
+        else:
+            # Summary not built yet (scripts/refresh_category_summary.py)
+            categories = await async_demo_db["products_trial_categories"].distinct("amazon_cat")
 
         return {
             "message": "Unique Amazon categories retrieved successfully",
@@ -180,63 +248,174 @@ def get_unique_amazon_categories():
 
 
 
+@router.get("/amazon/category-summary")
+async def get_amazon_category_summary():
+    try:
+        summary = await category_summary.get()
+
+        payload = [
+            {
+                "amazon_cat": entry["_id"],
+                "product_count": entry.get("product_count", 0),
+                "amazon_count": entry.get("amazon_count", 0),
+                "fulfillmen_count": entry.get("fulfillmen_count", 0),
+                "min_price": entry.get("min_price"),
+                "max_price": entry.get("max_price"),
+                "refreshed_at": entry.get("refreshed_at")
+            }
+            for entry in summary
+        ]
+
+        return MongoJSONResponse({
+            "message": "Amazon category summary retrieved successfully",
+            "payload": payload
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
 @router.get("/amazon/products-by-category")
-def get_amazon_products_by_category(
+async def get_amazon_products_by_category(
         category: str = Query(...),
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        cursor: str = Query(None)
 ):
+    # Keyset pagination: the cursor carries the last _id of the previous page
+    last_id = None
+    if cursor:
+        try:
+            last_id = pagination.decode_cursor(cursor, scope=category)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
     try:
-        collection = demo_db["products_trial_categories"]
-        total_count = collection.count_documents({"amazon_cat": category})
+        collection = async_demo_db["products_trial_categories"]
+        # Not the materialized summary: incremental refreshes miss deletions and category moves
+        total_count = await pagination.category_counts.get(
+            category, lambda: collection.count_documents({"amazon_cat": category})
+        )
 
-        products_cursor = collection.find(
-            {
-                "amazon_cat": category
-            }
-        ).skip(skip).limit(limit)
+        query = {"amazon_cat": category}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
 
-        products = json.loads(json_util.dumps(list(products_cursor)))
+        products_cursor = collection.find(query).sort("_id", 1)
+        if last_id is None and skip:
+            products_cursor = products_cursor.skip(skip)
+        documents = await products_cursor.limit(limit).to_list()
 
-        return {
+        next_cursor = None
+        if limit and len(documents) == limit:
+            next_cursor = pagination.encode_cursor(documents[-1]["_id"], scope=category)
+
+        return MongoJSONResponse({
             "message": f"Amazon products retrieved successfully for category: {category}",
-            "payload": products,
-            "total_count": total_count
-        }
+            "payload": documents,
+            "total_count": total_count,
+            "next_cursor": next_cursor
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
 
+# Sentinel that never equals a stored parent_product, so products without a parent look up nothing
+NO_PARENT_PRODUCT = "\u0000no-parent-product"
+FULFILLMEN_BATCH_MAX_ASINS = int(os.getenv("FULFILLMEN_BATCH_MAX_ASINS", "100"))
+# Fields the sourcing screens show for an Amazon product and its matches, /fulfillmen-product-details has the rest
+FULFILLMEN_MATCH_FIELDS = [field.strip() for field in os.getenv(
+    "FULFILLMEN_MATCH_FIELDS",
+    "amazon_asin,name,amazon_cat,amazon_product_price,amazon_product_url,amazon_product_image_url,skus,parent_product,is_amazon_product"
+).split(",") if field.strip()]
+
+
+def fulfillmen_matches_pipeline(match: dict) -> list:
+    """
+    One aggregation that returns each matched Amazon product together with its fulfillmen matches,
+    replacing a find_one by ASIN followed by a find by parent_product. Both sides are projected to
+    FULFILLMEN_MATCH_FIELDS.
+    """
+    # The ASIN and parent_product drive the grouping and the lookup, so they are always kept
+    projection = {field: 1 for field in ["amazon_asin", "parent_product", *FULFILLMEN_MATCH_FIELDS]}
+    return [
+        {"$match": match},
+        {"$project": projection},
+        # Keep the first product per ASIN, as find_one did
+        {"$group": {"_id": "$amazon_asin", "product": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$product"}},
+        {"$set": {
+            "_parent_lookup": {
+                "$cond": [{"$in": [{"$ifNull": ["$parent_product", ""]}, ["", None]]}, NO_PARENT_PRODUCT, "$parent_product"]
+            }
+        }},
+        {"$lookup": {
+            "from": "products_trial_categories",
+            "localField": "_parent_lookup",
+            "foreignField": "parent_product",
+            "pipeline": [{"$match": {"is_amazon_product": {"$ne": "1"}}}, {"$project": projection}],
+            "as": "fulfillmen_matches"
+        }},
+        {"$project": {"_parent_lookup": 0}},
+    ]
+
+
 @router.get("/fulfillmen-matches")
-def get_fulfillmen_matches_by_asin(asin: str = Query(...)):
+async def get_fulfillmen_matches_by_asin(asin: str = Query(...)):
     try:
-        collection = demo_db["products_trial_categories"]
+        collection = async_demo_db["products_trial_categories"]
 
-        amazon_product = collection.find_one({
-            "amazon_asin": asin,
-        })
+        results = await (await collection.aggregate(fulfillmen_matches_pipeline({"amazon_asin": asin}))).to_list()
 
-        if not amazon_product:
+        if not results:
             raise HTTPException(status_code=404, detail="Amazon product not found")
 
-        parent_product = amazon_product.get("parent_product")
+        amazon_product = results[0]
+        fulfillmen_products = amazon_product.pop("fulfillmen_matches")
 
-        if not parent_product:
+        if not amazon_product.get("parent_product"):
             raise HTTPException(status_code=404, detail="Parent product not found for this ASIN")
 
-        fulfillmen_cursor = collection.find({
-            "parent_product": parent_product,
-            "is_amazon_product": {"$ne": "1"}
+        return MongoJSONResponse({
+            "message": f"Fulfillmen matches retrieved successfully for ASIN: {asin}",
+            "payload": fulfillmen_products,
+            "amazon_product": amazon_product
         })
 
-        fulfillmen_products = json.loads(json_util.dumps(list(fulfillmen_cursor)))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        return {
-            "message": f"Fulfillmen matches retrieved successfully for ASIN: {asin}",
-            "payload": fulfillmen_products
-        }
+class AsinsRequest(BaseModel):
+    asins: List[str]
+
+@router.post("/fulfillmen-matches/batch")
+async def get_fulfillmen_matches_batch(request: AsinsRequest):
+    asins = list(dict.fromkeys(request.asins))
+    if not asins:
+        raise HTTPException(status_code=400, detail="No ASINs provided")
+    if len(asins) > FULFILLMEN_BATCH_MAX_ASINS:
+        raise HTTPException(status_code=400, detail=f"At most {FULFILLMEN_BATCH_MAX_ASINS} ASINs per request")
+
+    try:
+        collection = async_demo_db["products_trial_categories"]
+
+        matches = {}
+        results = await collection.aggregate(fulfillmen_matches_pipeline({"amazon_asin": {"$in": asins}}))
+        async for amazon_product in results:
+            fulfillmen_products = amazon_product.pop("fulfillmen_matches")
+            matches[amazon_product["amazon_asin"]] = {
+                "amazon_product": amazon_product,
+                "fulfillmen_matches": fulfillmen_products
+            }
+
+        return MongoJSONResponse({
+            "message": "Fulfillmen matches retrieved successfully",
+            "payload": matches,
+            "not_found": [asin for asin in asins if asin not in matches]
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -245,25 +424,23 @@ def get_fulfillmen_matches_by_asin(asin: str = Query(...)):
 
 
 @router.get("/fulfillmen-product-details")
-def get_fulfillmen_product_details(_id: str = Query(...)):
+async def get_fulfillmen_product_details(_id: str = Query(...)):
     try:
-        collection = demo_db["products_trial_categories"]
+        collection = async_demo_db["products_trial_categories"]
 
         object_id = ObjectId(_id)
 
-        product = collection.find_one({
+        product = await collection.find_one({
             "_id": object_id,
         })
 
         if not product:
             raise HTTPException(status_code=404, detail="Fulfillmen product not found")
 
-        product_json = json.loads(json_util.dumps(product))
-
-        return {
+        return MongoJSONResponse({
             "message": "Fulfillmen product details retrieved successfully",
-            "payload": product_json
-        }
+            "payload": product
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -272,56 +449,19 @@ def get_fulfillmen_product_details(_id: str = Query(...)):
 
 
 @router.get("/fulfillmen/matches/download-csv")
-def download_fulfillmen_matches_csv(asin: str = Query(...)):
+async def download_fulfillmen_matches_csv(asin: str = Query(...)):
 
     try:
-        collection = demo_db["products_trial_categories"]
+        collection = async_demo_db["products_trial_categories"]
 
-        products_cursor = collection.find({"amazon_asin": asin})
-        products = list(products_cursor)
+        first_product, products_cursor = await csv_export.find_for_export(collection, {"amazon_asin": asin})
 
-        if not products:
+        if not first_product:
             raise HTTPException(status_code=404, detail="No products found for this ASIN")
 
-        # Prepare CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Defining CSV header with fields
-        header = [
-            "ASIN",
-            "Title",
-            "Amazon Product Price",
-            "Amazon Product URL",
-            "Amazon Product Image URL",
-            "SKU",
-            "Parent Product",
-            "is_amazon_product",
-        ]
-        writer.writerow(header)
-
-        # Write product rows
-        for product in products:
-            skus = product.get("skus", "")
-            if isinstance(skus, list):
-                skus = ",".join([str(sku) for sku in skus])
-            row = [
-                product.get("amazon_asin", ""),
-                product.get("name", ""),
-                product.get("amazon_product_price", ""),
-                product.get("amazon_product_url", ""),
-                product.get("amazon_product_image_url", ""),
-                skus,
-                product.get("parent_product", ""),
-                product.get("is_amazon_product", ""),
-            ]
-            writer.writerow(row)
-
-        output.seek(0)
-        csv_content = output.getvalue()
-
-        return Response(
-            content=csv_content,
+        # Rows are written from the cursor in batches as the response is sent
+        return StreamingResponse(
+            csv_export.stream_csv(first_product, products_cursor),
             media_type="text/csv",
             headers={
                 "Content-Disposition": f"attachment; filename=fulfillmen_matches_{asin}.csv"
@@ -332,14 +472,79 @@ def download_fulfillmen_matches_csv(asin: str = Query(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/fulfillmen/matches/bulk-download-csv")
+async def bulk_download_fulfillmen_matches_csv(
+        asins: List[str] = Query(None),
+        category: str = Query(None)
+):
+    try:
+        if asins:
+            query = {"amazon_asin": {"$in": asins}}
+            filename = csv_export.export_filename(f"{len(asins)}_asins")
+        elif category:
+            query = {"amazon_cat": category}
+            filename = csv_export.export_filename(category)
+        else:
+            raise HTTPException(status_code=400, detail="Provide at least one asin or a category")
+
+        collection = async_demo_db["products_trial_categories"]
+
+        # The Lambda response is buffered whole, streaming only keeps the cursor side small
+        if await csv_export.exceeds_export_cap(collection, query):
+            raise HTTPException(
+                status_code=413,
+                detail=f"Export has more than {csv_export.CSV_EXPORT_MAX_ROWS} rows, request fewer asins"
+            )
+
+        first_product, products_cursor = await csv_export.find_for_export(collection, query)
+
+        if not first_product:
+            raise HTTPException(status_code=404, detail="No products found for this export")
+
+        return StreamingResponse(
+            csv_export.stream_csv(first_product, products_cursor),
+            media_type="text/csv",
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}"
+            },
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+
+@router.get("/snapshots/{name}")
+def download_catalog_snapshot(name: str):
+    if name not in catalog_snapshot.SNAPSHOTS:
+        raise HTTPException(status_code=404, detail=f"Unknown snapshot, choose one of: {', '.join(catalog_snapshot.SNAPSHOTS)}")
+
+    # Only serves what scripts/export_catalog_snapshot.py wrote to the shared directory, never exports here
+    age = catalog_snapshot.snapshot_age(name)
+    if age is None:
+        raise HTTPException(status_code=404, detail=f"Snapshot {name} has not been exported yet")
+    if age >= catalog_snapshot.CATALOG_SNAPSHOT_MAX_AGE:
+        raise HTTPException(status_code=503, detail=f"Snapshot {name} is {int(age)}s old, the export job has not refreshed it")
+
+    return FileResponse(
+        catalog_snapshot.snapshot_path(name),
+        media_type="application/octet-stream",
+        filename=f"{name}.pcat",
+        headers={"Cache-Control": f"max-age={int(catalog_snapshot.CATALOG_SNAPSHOT_MAX_AGE - age)}"}
+    )
+
+
 
 
 @router.get("/amazon/product-details")
-def get_amazon_product_details(asin: str = Query(...)):
+async def get_amazon_product_details(asin: str = Query(...)):
     try:
-        collection = demo_db["products_trial_categories"]
+        collection = async_demo_db["products_trial_categories"]
 
-        product = collection.find_one({"amazon_asin": asin})
+        product = await collection.find_one({"amazon_asin": asin})
 
         if not product:
             raise HTTPException(status_code=404, detail="Amazon product not found")
@@ -354,25 +559,22 @@ def get_amazon_product_details(asin: str = Query(...)):
 
 
 @router.get("/amazon/{product_id}")
-def get_product_by_id(product_id: str):
+async def get_product_by_id(product_id: str):
     try:
-        collection = demo_db["products_trial_categories"]
-
         # Validate ObjectId
         if not ObjectId.is_valid(product_id):
             raise HTTPException(status_code=400, detail="Invalid product ID")
 
-        product = collection.find_one({"_id": ObjectId(product_id)})
+        object_id = ObjectId(product_id)
+        product_json = await product_flight.do(("amazon_products", product_id), lambda: amazon_product_cache.get(object_id))
 
-        if not product:
+        if not product_json:
             raise HTTPException(status_code=404, detail="Product not found")
 
-        product_json = json.loads(json_util.dumps(product))
-
-        return {
+        return MongoJSONResponse({
             "message": "Product retrieved successfully",
             "payload": product_json
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
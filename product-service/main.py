@@ -3,7 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routers import products
 from app.routers import categories
 from app.routers import health_check
+from app.helpers import algolia_client, redis_client
+from app.helpers.category_snapshot import category_snapshot, CATEGORY_SNAPSHOT_WATCH
+from app.database import close_async_client
+from app.helpers import warmup, autocomplete
 from mangum import Mangum
+import os
 app = FastAPI(title="Product Service")
 
 app.add_middleware(
@@ -18,4 +23,36 @@ app.include_router(products.router)
 app.include_router(categories.router)
 app.include_router(health_check.router)
 
-handler = Mangum(app)
\ No newline at end of file
+def run_startup_tasks():
+    # Opt-in: normally indexes are provisioned once with scripts/ensure_indexes.py
+    if os.getenv("ENSURE_INDEXES_ON_STARTUP", "false").lower() in ("1", "true", "yes"):
+        from app.helpers.indexes import ensure_indexes
+        try:
+            for database, collection, name in ensure_indexes():
+                print(f"Created index {name} on {database}.{collection}")
+        except Exception as e:
+            print(f"Index provisioning failed: {e}")
+    if CATEGORY_SNAPSHOT_WATCH:
+        category_snapshot.start_watcher()
+    # Prebuilt by scripts/build_autocomplete_index.py, otherwise it is built in the background on first use
+    autocomplete.load_saved()
+
+@app.on_event("startup")
+def startup_event():
+    run_startup_tasks()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await algolia_client.close_client()
+    await redis_client.close_redis()
+    await close_async_client()
+
+# Mangum would run the lifespan around every invocation, closing the pooled clients after each
+# request. On Lambda the startup tasks run once per execution environment instead.
+handler = Mangum(app, lifespan="off")
+
+if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    run_startup_tasks()
+    # Opt-in: open the clients during init, e.g. for provisioned concurrency
+    if warmup.should_warm_up():
+        print(f"Warm-up finished: {warmup.warm_up()}")
\ No newline at end of file
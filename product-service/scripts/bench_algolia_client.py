@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Stand-in Algolia response: a page of ten small hits
+FAKE_RESPONSE = json.dumps({
+    "hits": [{"objectID": str(i), "name": f"Product {i}", "price": i * 10} for i in range(10)],
+    "nbHits": 10,
+    "page": 0
+}).encode()
+
+
+class FakeAlgoliaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(FAKE_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(FAKE_RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeAlgoliaServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_server(delay: float) -> ThreadingHTTPServer:
+    FakeAlgoliaHandler.delay = delay
+    server = FakeAlgoliaServer(("127.0.0.1", 0), FakeAlgoliaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentiles(samples: list) -> tuple:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+async def run_legacy(base_url: str, total: int, concurrency: int) -> list:
+    """Old behaviour: a fresh requests.post per call, run in the threadpool."""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    url = f"{base_url}/1/indexes/product_index/query"
+
+    def call():
+        requests.post(url, json={"params": "query=shoes&hitsPerPage=10&page=0"}).json()
+
+    async def one():
+        async with semaphore:
+            # Includes time spent waiting for a free worker thread
+            start = time.perf_counter()
+            await loop.run_in_executor(None, call)
+            return time.perf_counter() - start
+
+    return await asyncio.gather(*[one() for _ in range(total)])
+
+
+async def run_pooled(total: int, concurrency: int) -> list:
+    """New behaviour: the shared pooled async client."""
+    from app.helpers import algolia_client
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await algolia_client.search("query=shoes&hitsPerPage=10&page=0")
+            return time.perf_counter() - start
+
+    try:
+        return await asyncio.gather(*[one() for _ in range(total)])
+    finally:
+        await algolia_client.close_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy and pooled Algolia client latency against a local stand-in server.")
+    parser.add_argument("--requests", type=int, default=2000, help="Total number of search calls per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent in-flight calls")
+    parser.add_argument("--delay", type=float, default=0.02, help="Simulated Algolia processing time in seconds")
+    args = parser.parse_args()
+
+    server = start_server(args.delay)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # Must be set before the client module reads its configuration
+    os.environ["ALGOLIA_BASE_URL"] = base_url
+
+    try:
+        for name, runner in (
+            ("legacy requests.post", lambda: run_legacy(base_url, args.requests, args.concurrency)),
+            ("pooled async client", lambda: run_pooled(args.requests, args.concurrency)),
+        ):
+            start = time.perf_counter()
+            samples = asyncio.run(runner())
+            elapsed = time.perf_counter() - start
+            p50, p99 = percentiles(samples)
+            print(f"{name:22s} p50={p50:7.2f}ms  p99={p99:7.2f}ms  throughput={len(samples) / elapsed:8.1f} req/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from app.helpers.autocomplete import AutocompleteIndex
+
+WORDS = (
+    "red blue black steel cotton leather wooden plastic kids mens womens premium classic mini large "
+    "bottle shoes shirt bag lamp chair table mug phone case cable charger watch jacket socks towel "
+    "kettle pan knife spoon brush mirror pillow blanket speaker headphones keyboard mouse stand"
+).split()
+
+
+def synthetic_candidates(products: int, categories: int, seed: int) -> list:
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(products):
+        name = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9))) + f" {i}"
+        # Long-tailed popularity, most products are never viewed
+        views = int(rng.paretovariate(1.2)) if rng.random() < 0.2 else 0
+        candidates.append((name, "product", f"p{i}", float(views)))
+    for i in range(categories):
+        candidates.append((f"{rng.choice(WORDS)} {rng.choice(WORDS)}", "category", f"c{i}", 100.0))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure autocomplete index build time, memory and suggestion latency.")
+    parser.add_argument("--products", type=int, default=100000, help="Synthetic product names")
+    parser.add_argument("--categories", type=int, default=2000, help="Synthetic category names")
+    parser.add_argument("--queries", type=int, default=20000, help="Suggestion calls to time")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    candidates = synthetic_candidates(args.products, args.categories, args.seed)
+
+    start = time.perf_counter()
+    index = AutocompleteIndex()
+    index.build(candidates)
+    build_seconds = time.perf_counter() - start
+
+    # Separate build for the memory figure, tracing slows the build down a lot
+    tracemalloc.start()
+    traced = AutocompleteIndex()
+    traced.build(candidates)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traced
+    print(f"Built {index.stats()} in {build_seconds:.2f}s, {memory / 1024 / 1024:.1f} MiB")
+
+    rng = random.Random(args.seed + 1)
+    queries = []
+    for _ in range(args.queries):
+        word = rng.choice(WORDS)
+        if rng.random() < 0.3:
+            word = f"{rng.choice(WORDS)} {word}"
+        queries.append(word[:rng.randint(1, len(word))])
+
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.suggest(query, 10)
+        samples.append(time.perf_counter() - start)
+    cuts = statistics.quantiles(samples, n=100)
+    print(f"suggest: p50={cuts[49] * 1e6:.1f}us  p99={cuts[98] * 1e6:.1f}us  max={max(samples) * 1e6:.1f}us")
+    for query in ("b", "bo", "red sh", "kettle 12"):
+        print(f"{query!r}: {[s['text'] for s in index.suggest(query, 3)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import timeit
+from datetime import datetime
+from bson import ObjectId, Decimal128, json_util
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.helpers import bson_json
+
+
+def sample_product() -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": "Stainless steel insulated water bottle 1L",
+        "description": "Double wall vacuum insulated bottle, keeps drinks cold for 24 hours. " * 4,
+        "price": 499,
+        "sp": 449,
+        "mrp": Decimal128("799.00"),
+        "gst": "0.18",
+        "skus": ["SKU-1001", "SKU-1002", "SKU-1003"],
+        "images": [f"https://cdn.example.com/products/{i}.jpg" for i in range(8)],
+        "variable_pricing": [{"1-10": 449}, {"11-50": 420}, {">50": 399}],
+        "variants": [{"color": c, "stock": 100 + i} for i, c in enumerate(["red", "blue", "black", "steel"])],
+        "category_id": ObjectId(),
+        "created_at": datetime(2024, 3, 1, 10, 30, 15, 123000),
+        "updated_at": datetime(2024, 6, 12, 8, 0, 0),
+    }
+
+
+def sample_order() -> dict:
+    return {
+        "_id": ObjectId(),
+        "currency": "INR",
+        "shippingPhoneNumber": "9999999999",
+        "shippingAddress1": "12 MG Road",
+        "pStatus": "PD",
+        "oStatus": "OB",
+        "merchantId": "42",
+        "mkpOrderId": "MKP-0001",
+        "orderDetails": [
+            {
+                "sku": f"SKU-{i}",
+                "quantity": 5 + i,
+                "consumerPrice": 449.0,
+                "igst": 0.0,
+                "cgst": 34.2,
+                "sgst": 34.2,
+                "consumerPrice_before_taxes": 380.6,
+                "title": "Stainless steel insulated water bottle 1L",
+                "source": "Ex-china",
+            }
+            for i in range(10)
+        ],
+        "recipientName": "Buyer",
+        "shippingCity": "Bengaluru",
+        "shippingCountry": "India",
+        "total_amount": 22450,
+        "paidDate": datetime(2024, 6, 12, 8, 5, 0),
+        "createdAt": datetime(2024, 6, 12, 8, 0, 0),
+    }
+
+
+def legacy_render(document) -> bytes:
+    """What the routes did before: extended JSON round-trip, then FastAPI's own encoding."""
+    payload = json.loads(json_util.dumps(document))
+    return JSONResponse(jsonable_encoder({"message": "ok", "payload": payload})).body
+
+
+def direct_render(document) -> bytes:
+    return bson_json.MongoJSONResponse({"message": "ok", "payload": document}).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-response CPU for Mongo document serialization.")
+    parser.add_argument("--number", type=int, default=5000, help="Renders per measurement")
+    args = parser.parse_args()
+
+    cases = {
+        "product": sample_product(),
+        "order": sample_order(),
+        "product list (20)": [sample_product() for _ in range(20)],
+    }
+
+    for name, document in cases.items():
+        assert json.loads(legacy_render(document)) == json.loads(direct_render(document))
+        legacy = min(timeit.repeat(lambda: legacy_render(document), number=args.number, repeat=3)) / args.number
+        direct = min(timeit.repeat(lambda: direct_render(document), number=args.number, repeat=3)) / args.number
+        print(
+            f"{name:18s} legacy={legacy * 1e6:8.1f}us  direct={direct * 1e6:8.1f}us  "
+            f"saved={(legacy - direct) * 1e6:8.1f}us ({legacy / direct:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
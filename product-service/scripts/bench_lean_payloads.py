@@ -0,0 +1,85 @@
+import argparse
+from datetime import datetime
+from bson import ObjectId, Decimal128
+from app.helpers import bson_json, lean
+
+
+def sample_document(i: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": f"Stainless steel insulated water bottle 1L, model {i}",
+        "description": "Double wall vacuum insulated bottle, keeps drinks cold for 24 hours. " * 4,
+        "price": 499 + i,
+        "sp": 449 + i,
+        "mrp": Decimal128("799.00"),
+        "gst": "0.18",
+        "skus": [f"SKU-{i}-{v}" for v in range(3)],
+        "images": [f"https://cdn.example.com/products/{i}/{n}.jpg" for n in range(4)],
+        "variable_pricing": [{"1-10": 449}, {"11-50": 420}, {">50": 399}],
+        "variants": [{"color": c, "stock": 100 + n} for n, c in enumerate(["red", "blue", "black", "steel"])],
+        "category_id": ObjectId(),
+        "created_at": datetime(2024, 3, 1, 10, 30, 15),
+        "updated_at": datetime(2024, 6, 12, 8, 0, 0),
+    }
+
+
+def highlight(value: str) -> dict:
+    return {"value": value, "matchLevel": "partial", "fullyHighlighted": False, "matchedWords": ["bottle"]}
+
+
+def sample_hit(i: int) -> dict:
+    """An Algolia hit as returned without lean mode: every attribute plus highlight and snippet metadata."""
+    hit = bson_json.to_jsonable(sample_document(i))
+    hit["objectID"] = hit.pop("_id")["$oid"]
+    hit["_highlightResult"] = {
+        "name": highlight(hit["name"]),
+        "description": highlight(hit["description"]),
+        "skus": [highlight(sku) for sku in hit["skus"]],
+    }
+    hit["_snippetResult"] = {"description": {"value": hit["description"][:120] + " …", "matchLevel": "partial"}}
+    hit["_rankingInfo"] = {"nbTypos": 0, "firstMatchedWord": 0, "proximityDistance": 0, "userScore": 10, "words": 1}
+    return hit
+
+
+def algolia_lean_hit(hit: dict) -> dict:
+    """What Algolia sends back with attributesToRetrieve set and highlighting disabled."""
+    return lean.project({key: value for key, value in hit.items() if not key.startswith("_")})
+
+
+def payload_size(message: str, items: list) -> int:
+    return len(bson_json.dumps({"message": message, "payload": items}))
+
+
+def report(name: str, full: int, lean_size: int):
+    saved = full - lean_size
+    print(f"{name:34s} full={full:8d}B  lean={lean_size:8d}B  saved={saved:8d}B ({saved / full:5.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report response size with and without lean mode.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 50], help="Hits or documents per response")
+    args = parser.parse_args()
+
+    print(f"Lean fields: {', '.join(lean.LEAN_FIELDS)}")
+    for size in args.sizes:
+        hits = [sample_hit(i) for i in range(size)]
+        report(
+            f"/products ({size} hits)",
+            payload_size("Products retrieved successfully", hits),
+            payload_size("Products retrieved successfully", [algolia_lean_hit(hit) for hit in hits])
+        )
+        report(
+            f"/recommend ({size} hits)",
+            payload_size("Related products retrieved successfully", hits),
+            payload_size("Related products retrieved successfully", [algolia_lean_hit(hit) for hit in hits])
+        )
+        documents = [bson_json.to_jsonable(sample_document(i)) for i in range(size)]
+        report(
+            f"/multiple-products ({size} docs)",
+            payload_size("Successfully retrieved products", documents),
+            payload_size("Successfully retrieved products", [lean.project(doc) for doc in documents])
+        )
+
+
+if __name__ == "__main__":
+    main()
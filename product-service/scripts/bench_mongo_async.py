@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from pymongo import MongoClient, AsyncMongoClient
+
+# Starlette runs sync routes on an anyio threadpool limited to 40 threads
+DEFAULT_THREADS = 40
+BENCH_DATABASE = "bench_mongo_async"
+BENCH_COLLECTION = "products_trial_categories"
+
+
+def seed(mongo_url: str, documents: int, categories: int) -> list:
+    """Fills a scratch collection shaped like products_trial_categories and returns the category names."""
+    client = MongoClient(mongo_url)
+    collection = client[BENCH_DATABASE][BENCH_COLLECTION]
+    collection.drop()
+    names = [f"Category {i}" for i in range(categories)]
+    collection.insert_many([
+        {
+            "_id": ObjectId(),
+            "name": f"Product {i}",
+            "amazon_asin": f"B{i:09d}",
+            "amazon_cat": names[i % categories],
+            "amazon_product_price": 100 + i % 900,
+            "skus": [f"SKU-{i}-{v}" for v in range(3)],
+            "is_amazon_product": i % 2 == 0,
+        }
+        for i in range(documents)
+    ])
+    collection.create_index([("amazon_cat", 1), ("_id", 1)])
+    collection.create_index("amazon_asin")
+    client.close()
+    return names
+
+
+def percentiles(samples: list) -> tuple:
+    cuts = statistics.quantiles(samples, n=100)
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+async def run_sync(mongo_url: str, names: list, total: int, concurrency: int, threads: int) -> list:
+    """Old behaviour: sync route handlers, each query holding a worker thread."""
+    client = MongoClient(mongo_url)
+    collection = client[BENCH_DATABASE][BENCH_COLLECTION]
+    executor = ThreadPoolExecutor(max_workers=threads)
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    def call(i: int):
+        category = names[i % len(names)]
+        collection.count_documents({"amazon_cat": category})
+        list(collection.find({"amazon_cat": category}).sort("_id", 1).limit(20))
+        collection.find_one({"amazon_asin": f"B{i:09d}"})
+
+    async def one(i: int):
+        async with semaphore:
+            # Includes time spent waiting for a free worker thread
+            start = time.perf_counter()
+            await loop.run_in_executor(executor, call, i)
+            return time.perf_counter() - start
+
+    try:
+        return await asyncio.gather(*[one(i) for i in range(total)])
+    finally:
+        executor.shutdown()
+        client.close()
+
+
+async def run_async(mongo_url: str, names: list, total: int, concurrency: int) -> list:
+    """New behaviour: async route handlers sharing one AsyncMongoClient on the event loop."""
+    client = AsyncMongoClient(mongo_url)
+    collection = client[BENCH_DATABASE][BENCH_COLLECTION]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(i: int):
+        category = names[i % len(names)]
+        await collection.count_documents({"amazon_cat": category})
+        await collection.find({"amazon_cat": category}).sort("_id", 1).limit(20).to_list()
+        await collection.find_one({"amazon_asin": f"B{i:09d}"})
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            return time.perf_counter() - start
+
+    try:
+        return await asyncio.gather(*[one(i) for i in range(total)])
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync-in-threadpool and async Mongo access for the product routes.")
+    parser.add_argument("--requests", type=int, default=5000, help="Total number of simulated requests per run")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent in-flight requests")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Worker threads for the sync run")
+    parser.add_argument("--documents", type=int, default=20000, help="Documents seeded into the scratch collection")
+    parser.add_argument("--categories", type=int, default=50, help="Distinct amazon_cat values")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database afterwards")
+    args = parser.parse_args()
+
+    mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017")
+    names = seed(mongo_url, args.documents, args.categories)
+    print(f"Seeded {args.documents} documents into {BENCH_DATABASE}.{BENCH_COLLECTION}")
+
+    try:
+        for name, runner in (
+            (f"sync ({args.threads} threads)", lambda: run_sync(mongo_url, names, args.requests, args.concurrency, args.threads)),
+            ("async client", lambda: run_async(mongo_url, names, args.requests, args.concurrency)),
+        ):
+            start = time.perf_counter()
+            samples = asyncio.run(runner())
+            elapsed = time.perf_counter() - start
+            p50, p99 = percentiles(samples)
+            print(f"{name:22s} p50={p50:7.2f}ms  p99={p99:7.2f}ms  throughput={len(samples) / elapsed:8.1f} req/s")
+    finally:
+        if not args.keep:
+            MongoClient(mongo_url).drop_database(BENCH_DATABASE)
+
+
+if __name__ == "__main__":
+    main()
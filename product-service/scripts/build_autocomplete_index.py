@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+import time
+from app.helpers.autocomplete import AUTOCOMPLETE_INDEX_PATH, build_index, load_views
+from app.helpers.redis_client import close_redis
+
+
+async def read_views() -> dict:
+    try:
+        return await load_views()
+    finally:
+        await close_redis()
+
+
+def main(path: str):
+    """Builds the autocomplete index from Mongo and the view counter, and writes it for startup to load."""
+    start = time.perf_counter()
+    index = build_index(asyncio.run(read_views()))
+    index.save(path)
+    print(f"Saved {len(index)} suggestions ({len(index.keys)} keys) to {path} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the autocomplete index offline, so cold starts load it instead of scanning Mongo.")
+    parser.add_argument("--path", default=AUTOCOMPLETE_INDEX_PATH, help="Where to write the index file")
+
+    args = parser.parse_args()
+
+    main(path=args.path)
@@ -0,0 +1,32 @@
+import argparse
+import time
+from app.database import db
+from app.helpers.local_search import LocalSearchIndex, LOCAL_SEARCH_INDEX_PATH, PRODUCTS_COLLECTION
+
+
+def build_index(path: str, incremental: bool):
+    """Builds (or catches up) the local search index and writes it to disk for warm starts."""
+    collection = db[PRODUCTS_COLLECTION]
+    start = time.perf_counter()
+
+    index = LocalSearchIndex.load(path) if incremental else None
+    if index is None:
+        index = LocalSearchIndex()
+        index.build(collection)
+        print(f"Indexed {len(index)} products from scratch")
+    else:
+        updated = index.refresh(collection)
+        print(f"Re-indexed {updated} changed products ({len(index)} total)")
+
+    index.save(path)
+    print(f"Saved index to {path} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the local product search index.")
+    parser.add_argument("--path", default=LOCAL_SEARCH_INDEX_PATH, help="Where to write the index file")
+    parser.add_argument("--incremental", action="store_true", help="Refresh an existing index file instead of rebuilding")
+
+    args = parser.parse_args()
+
+    build_index(path=args.path, incremental=args.incremental)
@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DATABASE = "check_algolia_sync"
+
+
+class FakeAlgoliaIndex(BaseHTTPRequestHandler):
+    """Applies batch operations to an in-memory index, failing every `fail_every`-th call with a 503."""
+    records = {}
+    calls = 0
+    fail_every = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.lock:
+            FakeAlgoliaIndex.calls += 1
+            if self.fail_every and FakeAlgoliaIndex.calls % self.fail_every == 0:
+                self.send_response(503)
+                self.end_headers()
+                return
+            for operation in body["requests"]:
+                object_id = operation["body"]["objectID"]
+                if operation["action"] == "deleteObject":
+                    self.records.pop(object_id, None)
+                elif operation["action"] == "updateObject":
+                    self.records[object_id] = operation["body"]
+                else:
+                    self.records.setdefault(object_id, {}).update(operation["body"])
+        payload = json.dumps({"taskID": FakeAlgoliaIndex.calls, "objectIDs": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(fail_every: int) -> ThreadingHTTPServer:
+    FakeAlgoliaIndex.fail_every = fail_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAlgoliaIndex)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def expect(condition: bool, message: str):
+    print(("ok   " if condition else "FAIL ") + message)
+    if not condition:
+        raise SystemExit(1)
+
+
+async def check(documents: int, watch: bool):
+    # Imported late so they pick up the stand-in URL set in main()
+    from app.database import async_mongo_client
+    from app.helpers import algolia_client
+    from app.helpers.algolia_sync import AlgoliaSync
+
+    database = async_mongo_client[BENCH_DATABASE]
+    products, state = database["products"], database["algolia_sync_state"]
+    await async_mongo_client.drop_database(BENCH_DATABASE)
+    base = datetime(2024, 1, 1)
+    await products.insert_many([
+        {"name": f"Product {i}", "price": i, "updated_at": base + timedelta(seconds=i // 3)}
+        for i in range(documents)
+    ])
+
+    def worker():
+        return AlgoliaSync(products, state, batch_size=100, flush_interval=0.05, concurrency=4, queue_size=50)
+
+    try:
+        first = worker()
+        await first.run(mode="poll", once=True)
+        expect(len(FakeAlgoliaIndex.records) == documents, f"initial poll indexed {len(FakeAlgoliaIndex.records)}/{documents} products")
+        expect(first.retries > 0 or not FakeAlgoliaIndex.fail_every, f"503s were retried ({first.retries} retries)")
+
+        changed = await products.find().sort("_id", 1).limit(10).to_list()
+        for document in changed:
+            await products.update_one(
+                {"_id": document["_id"]},
+                {"$set": {"price": -1, "updated_at": base + timedelta(days=1)}}
+            )
+        second = worker()
+        await second.run(mode="poll", once=True)
+        expect(second.indexed == len(changed), f"resumed poll sent only the {second.indexed} changed products")
+        expect(
+            all(FakeAlgoliaIndex.records[str(document["_id"])]["price"] == -1 for document in changed),
+            "changed prices reached the index"
+        )
+
+        if watch:
+            third = worker()
+            task = asyncio.create_task(third.run(mode="watch"))
+            await asyncio.sleep(1)
+            inserted = (await products.insert_one({"name": "Streamed", "price": 5})).inserted_id
+            await products.update_one({"_id": inserted}, {"$set": {"price": 6}})
+            await products.delete_one({"_id": changed[0]["_id"]})
+            await asyncio.sleep(2)
+            task.cancel()
+            expect(FakeAlgoliaIndex.records.get(str(inserted), {}).get("price") == 6, "change stream insert and partial update indexed")
+            expect(str(changed[0]["_id"]) not in FakeAlgoliaIndex.records, "change stream delete indexed")
+            saved = await state.find_one({"_id": "products"})
+            expect(bool(saved and saved.get("resume_token")), "resume token persisted")
+    finally:
+        await async_mongo_client.drop_database(BENCH_DATABASE)
+        await algolia_client.close_client()
+        await async_mongo_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the Algolia sync worker against a local mongod and a stand-in Algolia server.")
+    parser.add_argument("--documents", type=int, default=2000, help="Products seeded into the scratch database")
+    parser.add_argument("--fail-every", type=int, default=7, help="Answer every n-th batch call with a 503 (0 disables)")
+    parser.add_argument("--watch", action="store_true", help="Also check change stream mode (mongod must be a replica set)")
+    args = parser.parse_args()
+
+    server = start_server(args.fail_every)
+    os.environ["ALGOLIA_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    try:
+        asyncio.run(check(args.documents, args.watch))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
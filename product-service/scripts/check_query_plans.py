@@ -0,0 +1,87 @@
+import argparse
+import sys
+from bson import ObjectId
+from app.helpers.indexes import DATABASES, ensure_indexes
+
+
+def sample_value(collection, field: str, default):
+    """Uses a real value from the collection when there is one, so the planner sees realistic selectivity."""
+    document = collection.find_one({field: {"$exists": True}}, {field: 1})
+    return document[field] if document else default
+
+
+def route_queries() -> list:
+    """(route, database, collection, filter, sort) for every Mongo query the product routes issue."""
+    demo = DATABASES["demo"]["products_trial_categories"]
+    category = sample_value(demo, "amazon_cat", "Electronics")
+    asin = sample_value(demo, "amazon_asin", "B000000000")
+    parent = sample_value(demo, "parent_product", "parent")
+
+    return [
+        ("products-by-category (skip)", "demo", "products_trial_categories", {"amazon_cat": category}, [("_id", 1)]),
+        ("products-by-category (cursor)", "demo", "products_trial_categories", {"amazon_cat": category, "_id": {"$gt": ObjectId("000000000000000000000000")}}, [("_id", 1)]),
+        ("products-by-category (count)", "demo", "products_trial_categories", {"amazon_cat": category}, None),
+        ("fulfillmen-matches (asin)", "demo", "products_trial_categories", {"amazon_asin": asin}, None),
+        ("fulfillmen-matches ($lookup)", "demo", "products_trial_categories", {"parent_product": parent, "is_amazon_product": {"$ne": "1"}}, None),
+        ("amazon/product-details", "demo", "products_trial_categories", {"amazon_asin": asin}, None),
+        ("download-csv", "demo", "products_trial_categories", {"amazon_asin": asin}, None),
+        ("bulk-download-csv (asins)", "demo", "products_trial_categories", {"amazon_asin": {"$in": [asin]}}, None),
+        ("bulk-download-csv (category)", "demo", "products_trial_categories", {"amazon_cat": category}, None),
+        ("product by id", "main", "products", {"_id": ObjectId()}, None),
+        ("multiple-products", "main", "products", {"_id": {"$in": [ObjectId(), ObjectId()]}}, None),
+        ("amazon product by id", "demo", "products_trial_categories", {"_id": ObjectId()}, None),
+    ]
+
+
+def plan_stages(plan) -> list:
+    """Collects every stage name in an explain() plan tree (classic and SBE formats)."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+
+def check_query_plans() -> list:
+    """Runs explain() for each route query and returns those whose winning plan contains a COLLSCAN."""
+    failures = []
+    for route, database, collection_name, query, sort in route_queries():
+        cursor = DATABASES[database][collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = plan_stages(winning_plan)
+        status = "FAIL" if "COLLSCAN" in stages else "ok"
+        print(f"{status:4s} {route:32s} {' > '.join(stages)}")
+        if status == "FAIL":
+            failures.append(route)
+
+    # distinct("amazon_cat") for /amazon/categories
+    explain = DATABASES["demo"].command({"explain": {"distinct": "products_trial_categories", "key": "amazon_cat"}})
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    status = "FAIL" if "COLLSCAN" in stages else "ok"
+    print(f"{status:4s} {'amazon/categories (distinct)':32s} {' > '.join(stages)}")
+    if status == "FAIL":
+        failures.append("amazon/categories (distinct)")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if any product service query is planned as a collection scan.")
+    parser.add_argument("--ensure-indexes", action="store_true", help="Create missing manifest indexes before checking")
+
+    args = parser.parse_args()
+
+    if args.ensure_indexes:
+        ensure_indexes()
+
+    failures = check_query_plans()
+    if failures:
+        print(f"{len(failures)} route queries fall back to COLLSCAN: {', '.join(failures)}")
+        sys.exit(1)
+    print("No route query uses a collection scan.")
@@ -0,0 +1,16 @@
+import argparse
+from app.helpers.indexes import ensure_indexes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the indexes declared in the product service index manifest.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the indexes that are missing")
+
+    args = parser.parse_args()
+
+    missing = ensure_indexes(dry_run=args.dry_run)
+    if not missing:
+        print("All manifest indexes exist.")
+    for database, collection, name in missing:
+        action = "Missing" if args.dry_run else "Created"
+        print(f"{action}: {database}.{collection} {name}")
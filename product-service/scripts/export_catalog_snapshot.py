@@ -0,0 +1,44 @@
+import argparse
+import math
+import os
+import time
+from app.helpers.catalog_snapshot import SNAPSHOTS, CATALOG_SNAPSHOT_DIR, CATALOG_SNAPSHOT_MAX_AGE, export_snapshot, ensure_snapshot, snapshot_path, SnapshotReader
+
+
+def inspect(path: str):
+    """Maps a snapshot and touches every numeric value, to show what a consumer's load costs."""
+    start = time.perf_counter()
+    with SnapshotReader(path) as reader:
+        opened = time.perf_counter() - start
+        print(f"{path}: {reader.rows} rows, {os.path.getsize(path) / 1024 / 1024:.1f} MiB, mapped in {opened * 1000:.2f}ms")
+        for name, column in reader.columns.items():
+            start = time.perf_counter()
+            values = reader.column(name)
+            if column["kind"] == "f8":
+                present = [value for value in values if not math.isnan(value)]
+                summary = f"{len(present)} values, sum {sum(present):.2f}"
+            elif column["kind"] == "dict":
+                summary = f"{len(values.table)} distinct values"
+            else:
+                summary = f"first {values[0]!r}" if len(values) else "empty"
+            print(f"  {name:22s} {column['kind']:5s} {summary} ({(time.perf_counter() - start) * 1000:.1f}ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the catalog to columnar snapshot files. Run on a schedule to keep the served snapshots fresh.")
+    parser.add_argument("names", nargs="*", default=list(SNAPSHOTS), help=f"Snapshots to export ({', '.join(SNAPSHOTS)})")
+    parser.add_argument("--dir", default=CATALOG_SNAPSHOT_DIR, help="Output directory, the shared CATALOG_SNAPSHOT_DIR by default")
+    parser.add_argument("--inspect", action="store_true", help="Only load the existing files and report on them")
+    parser.add_argument("--if-older-than", type=float, metavar="SECONDS",
+                        help=f"Skip snapshots younger than this, e.g. {int(CATALOG_SNAPSHOT_MAX_AGE // 2)} to refresh well before they stop being served")
+
+    args = parser.parse_args()
+
+    for name in args.names:
+        if args.if_older_than is not None and not args.inspect:
+            ensure_snapshot(name, args.if_older_than, args.dir)
+        elif not args.inspect:
+            start = time.perf_counter()
+            header = export_snapshot(name, args.dir)
+            print(f"Exported {header['rows']} rows of {header['collection']} in {time.perf_counter() - start:.2f}s")
+        inspect(snapshot_path(name, args.dir))
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure(module: str) -> list:
+    """Imports `module` in a fresh interpreter and returns (name, self_us, cumulative_us, depth) per imported module."""
+    # Pretend to be a Lambda cold start without running the AWS-only startup tasks
+    env = {key: value for key, value in os.environ.items() if key != "AWS_LAMBDA_FUNCTION_NAME"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def report(module: str, runs: int, top: int) -> dict:
+    samples = [measure(module) for _ in range(runs)]
+    # The target module is the last line; its cumulative time is the whole import
+    totals = [entries[-1][2] for entries in samples]
+    median_run = samples[totals.index(sorted(totals)[len(totals) // 2])]
+
+    by_cumulative = sorted(median_run, key=lambda entry: -entry[2])[:top]
+    by_self = sorted(median_run, key=lambda entry: -entry[1])[:top]
+    first_party = [entry for entry in median_run if entry[0] in ("main", "app") or entry[0].startswith("app.")]
+    return {
+        "module": module,
+        "runs": runs,
+        "total_ms": {
+            "median": round(statistics.median(totals) / 1000, 1),
+            "min": round(min(totals) / 1000, 1),
+            "max": round(max(totals) / 1000, 1),
+        },
+        "modules_imported": len(median_run),
+        "top_cumulative": [{"module": name, "cumulative_ms": round(cumulative / 1000, 1)} for name, _, cumulative, _ in by_cumulative],
+        "top_self": [{"module": name, "self_ms": round(self_us / 1000, 1)} for name, self_us, _, _ in by_self],
+        "first_party": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, self_us, cumulative, _ in sorted(first_party, key=lambda entry: -entry[2])
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report where the import time of the Lambda entry point goes, using python -X importtime.")
+    parser.add_argument("--module", default="main", help="Module to import, main is what the Lambda handler loads")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure, the median run is reported")
+    parser.add_argument("--top", type=int, default=15, help="Modules listed per table")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    result = report(args.module, args.runs, args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    total = result["total_ms"]
+    print(f"import {result['module']}: median {total['median']} ms (min {total['min']}, max {total['max']}) "
+          f"over {result['runs']} runs, {result['modules_imported']} modules")
+    print("\nslowest by cumulative time")
+    for entry in result["top_cumulative"]:
+        print(f"  {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+    print("\nslowest by self time")
+    for entry in result["top_self"]:
+        print(f"  {entry['self_ms']:>8.1f} ms  {entry['module']}")
+    print("\nfirst-party modules (self / cumulative)")
+    for entry in result["first_party"]:
+        print(f"  {entry['self_ms']:>8.1f} / {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import time
+from app.helpers import algolia_client, recommendations
+from app.helpers.redis_client import get_redis, close_redis
+
+
+async def precompute(top: int, sizes: list, include_lean: bool, concurrency: int):
+    """Warms the shared recommendation cache for the most viewed products."""
+    if get_redis() is None:
+        raise SystemExit("REDIS_URL is not set, there is no shared cache to warm")
+
+    start = time.perf_counter()
+    try:
+        product_ids = await recommendations.top_viewed(top)
+        print(f"Found {len(product_ids)} viewed products")
+        lean_modes = [False, True] if include_lean else [False]
+        outcome = await recommendations.precompute(product_ids, sizes, lean_modes, concurrency)
+    finally:
+        await algolia_client.close_client()
+        await close_redis()
+
+    print(f"Stored {outcome['stored']} recommendation sets, {outcome['failed']} failed, in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute recommendations for the most viewed products.")
+    parser.add_argument("--top", type=int, default=500, help="Number of most viewed products to warm")
+    parser.add_argument("--max-recommendations", type=int, nargs="+", default=[10], help="Recommendation list sizes the pages request")
+    parser.add_argument("--lean", action="store_true", help="Also warm the lean variant")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel Algolia calls")
+
+    args = parser.parse_args()
+
+    asyncio.run(precompute(args.top, args.max_recommendations, args.lean, args.concurrency))
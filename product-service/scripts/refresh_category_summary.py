@@ -0,0 +1,16 @@
+import argparse
+import time
+from app.helpers.category_summary import refresh_summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the materialized Amazon category summary.")
+    parser.add_argument("--full", action="store_true",
+                        help="Recount every category and drop empty ones, otherwise done once per AMAZON_CATEGORY_SUMMARY_FULL_INTERVAL")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = refresh_summary(full=args.full)
+    print(f"{result['mode'].capitalize()} refresh updated {result['categories']} categories, "
+          f"removed {result.get('removed', 0)}, in {time.perf_counter() - start:.2f}s")
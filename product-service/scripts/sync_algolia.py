@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+from app.database import async_db, async_mongo_client
+from app.helpers import algolia_client
+from app.helpers.algolia_sync import AlgoliaSync, ALGOLIA_SYNC_MODE, SYNC_STATE_COLLECTION
+from app.helpers.local_search import PRODUCTS_COLLECTION
+
+
+async def sync(mode: str, once: bool, reset: bool):
+    """Keeps the Algolia product index in step with the products collection."""
+    worker = AlgoliaSync(async_db[PRODUCTS_COLLECTION], async_db[SYNC_STATE_COLLECTION])
+    try:
+        if reset:
+            await worker.reset_state()
+            print("Cleared the stored sync position")
+        await worker.run(mode=mode, once=once)
+    finally:
+        print(f"Sync stopped: {worker.stats()}")
+        await algolia_client.close_client()
+        await async_mongo_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync product changes from Mongo to the Algolia index.")
+    parser.add_argument("--mode", choices=["watch", "poll"], default=ALGOLIA_SYNC_MODE, help="Change stream (replica set) or updated_at polling")
+    parser.add_argument("--once", action="store_true", help="Poll mode only: exit after catching up")
+    parser.add_argument("--reset", action="store_true", help="Forget the stored resume token / watermark first")
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(sync(args.mode, args.once, args.reset))
+    except KeyboardInterrupt:
+        pass